@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 from .health import router as health_router
 from .auth import router as auth_router
+from .search import router as search_router
+from .chat import router as chat_router
+from .usage import router as usage_router
+from .admin import router as admin_router
 
 router = APIRouter(prefix="/api/v1", tags=["API"])
 
 router.include_router(health_router)
 router.include_router(auth_router)
+router.include_router(search_router)
+router.include_router(chat_router)
+router.include_router(usage_router)
+router.include_router(admin_router)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.database import get_db
+from app.schemas.userschema import UserPage, UserSchema
+from app.service.admin_service import DeletedFilter, list_users
+from app.service.auth_service import get_current_admin_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/users", response_model=UserPage)
+async def users_directory(
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
+    is_active: Optional[bool] = None,
+    deleted: DeletedFilter = "exclude",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    admin: UserSchema = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Каталог пользователей для поддержки.
+
+    Args:
+        q: Префикс username или email (без учета регистра)
+        is_active: Фильтр по активности
+        deleted: exclude, only или include — учет мягко удаленных
+        limit: Размер страницы
+        cursor: Курсор следующей страницы из предыдущего ответа
+        admin: Текущий пользователь-администратор
+        db: Сессия базы данных
+
+    Returns:
+        UserPage: Страница пользователей; `estimated_total` — оценка,
+        возвращается только для первой страницы
+    """
+    return await list_users(
+        db, q=q, is_active=is_active, deleted=deleted, limit=limit, cursor=cursor
+    )
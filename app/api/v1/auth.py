@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
+from app.audit import writer as audit
 from app.db.database import get_db
 from app.jwtauth import utils as auth_utils
 from app.schemas.userschema import UserSchema, TokenInfo, UserCreate, UserRead
+from app.schemas.tokenschema import IntrospectRequest, IntrospectResponse
 from app.service.auth_service import (
     validate_auth_user,
     get_current_active_user,
     create_user,
+    introspect_tokens,
+    get_introspection_client,
 )
 from app.core.config import settings
 from app.exceptions.base_ex import BadRequestException
@@ -17,13 +23,16 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(
+    user: UserCreate, request: Request, db: AsyncSession = Depends(get_db)
+):
     """
     Регистрация нового пользователя.
     
     Args:
         user: Данные для создания пользователя (username, password, email).
               ID генерируется автоматически.
+        request: HTTP-запрос (для журнала безопасности)
         db: Сессия базы данных
         
     Returns:
@@ -32,7 +41,7 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     Raises:
         BadRequestException: Если пользователь с таким username или email уже существует
     """
-    res = await create_user(db, user)
+    res = await create_user(db, user, request)
     if res.get("status") == "error":
         raise BadRequestException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,6 +65,7 @@ async def login(user: "UserSchema" = Depends(validate_auth_user)):
         HTTPException: При неверных учетных данных или неактивном пользователе
     """
     jwt_payload = {
+        auth_utils.TOKEN_TYPE_FIELD: auth_utils.ACCESS_TOKEN_TYPE,
         "sub": str(user.id),
         "name": user.username,
         "email": user.email,
@@ -65,7 +75,10 @@ async def login(user: "UserSchema" = Depends(validate_auth_user)):
         jwt_payload, expires_in=settings.auth_settings.access_token_expires_minutes
     )
     refresh_token = auth_utils.encode_jwt(
-        {"sub": str(user.id)},
+        {
+            auth_utils.TOKEN_TYPE_FIELD: auth_utils.REFRESH_TOKEN_TYPE,
+            "sub": str(user.id),
+        },
         expires_in=settings.auth_settings.refresh_token_expires_minutes,
     )
 
@@ -75,11 +88,16 @@ async def login(user: "UserSchema" = Depends(validate_auth_user)):
 
 
 @router.post("/refresh", response_model=TokenInfo)
-async def refresh_token(payload: dict = Depends(lambda: {}), token: str | None = None):
+async def refresh_token(
+    request: Request,
+    payload: dict = Depends(lambda: {}),
+    token: str | None = None,
+):
     """
     Обновление access токена с помощью refresh токена.
     
     Args:
+        request: HTTP-запрос (для журнала безопасности)
         payload: Данные из тела запроса (не используется)
         token: Refresh токен для обновления access токена
         
@@ -94,8 +112,16 @@ async def refresh_token(payload: dict = Depends(lambda: {}), token: str | None =
         return TokenInfo(access_token="", token_type="bearer")
 
     data = auth_utils.decode_jwt(token)
+    sub = data.get("sub")
+    await audit.audit_log.emit(
+        audit.TOKEN_REFRESH,
+        request=request,
+        user_id=UUID(sub) if sub else None,
+        username=data.get("name"),
+    )
     new_access = auth_utils.encode_jwt(
         {
+            auth_utils.TOKEN_TYPE_FIELD: auth_utils.ACCESS_TOKEN_TYPE,
             "sub": data.get("sub"),
             "name": data.get("name"),
             "email": data.get("email"),
@@ -104,6 +130,30 @@ async def refresh_token(payload: dict = Depends(lambda: {}), token: str | None =
     return TokenInfo(access_token=new_access, token_type="bearer")
 
 
+@router.post("/introspect", response_model=IntrospectResponse)
+async def introspect(
+    request: IntrospectRequest, client_id: str = Depends(get_introspection_client)
+):
+    """
+    Пакетная проверка токенов для сторонних сервисов.
+    
+    Доступна только сервисам из `auth_settings.introspect_clients`
+    (HTTP Basic: client_id и секрет).
+    
+    Args:
+        request: Список токенов (до `introspect_max_tokens` за вызов)
+        client_id: Сервис, запросивший проверку
+        
+    Returns:
+        IntrospectResponse: Результат для каждого токена в исходном порядке
+        
+    Note:
+        Если сервису достаточно проверки подписи, лучше проверять токены
+        локально по ключам из /.well-known/jwks.json.
+    """
+    return IntrospectResponse(results=await introspect_tokens(request.tokens))
+
+
 @router.get("/logout/me")
 async def logout_me(user: UserSchema = Depends(get_current_active_user)):
     """
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+
+from app.schemas.chatschema import ChatRequest, ChatReply, CacheStats
+from app.schemas.userschema import UserSchema
+from app.service.auth_service import get_current_active_user
+from app.service.chat_service import generate_reply, stream_reply, get_cache_stats
+from app.service.quota_service import QUOTA_WARNING_HEADER, enforce_quota
+
+router = APIRouter(prefix="/chat", tags=["chat"])
+
+
+@router.post("/", response_model=ChatReply)
+async def chat(
+    request: ChatRequest,
+    user: UserSchema = Depends(enforce_quota),
+):
+    """
+    Получение ответа ассистента целиком.
+
+    Args:
+        request: Промпт, контекст и параметры генерации
+        user: Текущий авторизованный пользователь
+
+    Returns:
+        ChatReply: Ответ ассистента
+    """
+    return await generate_reply(request, user.id)
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    response: Response,
+    user: UserSchema = Depends(enforce_quota),
+):
+    """
+    Получение ответа ассистента потоком (text/plain, по частям).
+
+    Идентификатор обмена возвращается в заголовке `X-Message-Id`.
+
+    Args:
+        request: Промпт, контекст и параметры генерации
+        response: Ответ, в который `enforce_quota` пишет `X-Quota-Warning`
+        user: Текущий авторизованный пользователь
+    """
+    message_id, chunks = stream_reply(request, user.id)
+    headers = {"X-Message-Id": message_id}
+    if QUOTA_WARNING_HEADER in response.headers:
+        headers[QUOTA_WARNING_HEADER] = response.headers[QUOTA_WARNING_HEADER]
+    return StreamingResponse(chunks, media_type="text/plain", headers=headers)
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def cache_stats(user: UserSchema = Depends(get_current_active_user)):
+    """
+    Метрики кэша ответов.
+
+    Returns:
+        CacheStats: Число запросов, попаданий, объединенных запросов,
+        доля попаданий и сэкономленное время генерации в секундах
+    """
+    return get_cache_stats()
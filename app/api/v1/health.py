@@ -1,4 +1,10 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.audit.writer import audit_log
+from app.middleware.admission import admission_controller
+from app.schemas.healthschema import ReadinessReport
+from app.tasks.health_probe import dependency_probe
 
 
 router = APIRouter(prefix="/health", tags=["Health"])
@@ -11,4 +17,62 @@ async def health_check():
     Returns:
         dict: Статус сервиса {"status": "ok"}
     """
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/live")
+async def liveness():
+    """
+    Liveness-проба: процесс жив и event loop обслуживает запросы.
+    
+    Зависимости не проверяет — их недоступность не повод перезапускать воркер.
+    Не проходит контроль допуска: перегруженный, но живой воркер не должен
+    получать 503 и перезапускаться.
+    
+    Returns:
+        dict: {"status": "ok"}
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready", response_model=ReadinessReport)
+async def readiness():
+    """
+    Readiness-проба: результат последней фоновой проверки зависимостей.
+    
+    Не обращается к БД — читает кэш. Пока воркер деградирован (БД
+    недоступна, пул исчерпан, нет ключей, event loop отстает), отвечает 503
+    и выпадает из ротации балансировщика.
+    
+    Returns:
+        ReadinessReport: Готовность и результаты отдельных проверок
+    """
+    report = dependency_probe.report()
+    return JSONResponse(
+        status_code=200 if report.ready else 503,
+        content=report.model_dump(mode="json"),
+    )
+
+
+@router.get("/admission")
+async def admission_stats():
+    """
+    Состояние контроля допуска по группам маршрутов.
+    
+    Returns:
+        dict: Текущий лимит, число выполняемых и ожидающих запросов,
+        счетчики допущенных и отклоненных запросов для каждой группы
+    """
+    return admission_controller.stats()
+
+
+@router.get("/audit")
+async def audit_stats():
+    """
+    Состояние журнала безопасности.
+    
+    Returns:
+        dict: Размер очереди и счетчики записанных, отброшенных при
+        переполнении и потерянных из-за ошибок вставки событий
+    """
+    return audit_log.stats()
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.schemas.searchschema import SearchResponse
+from app.schemas.userschema import UserSchema
+from app.service.auth_service import get_current_active_user
+from app.service.search_service import search_messages
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/messages", response_model=SearchResponse)
+async def search_history(
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(10, ge=1, le=settings.search.max_top_k),
+    user: UserSchema = Depends(get_current_active_user),
+):
+    """
+    Семантический поиск по истории переписки текущего пользователя.
+
+    Args:
+        q: Текст запроса
+        limit: Максимальное число результатов
+        user: Текущий авторизованный пользователь
+
+    Returns:
+        SearchResponse: Найденные сообщения, отсортированные по близости
+    """
+    hits = await search_messages(user.id, q, limit)
+    return SearchResponse(query=q, hits=hits)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.database import get_db
+from app.quota.manager import quota_manager
+from app.schemas.usageschema import Period, UsageReport
+from app.schemas.userschema import UserSchema
+from app.service.auth_service import get_current_active_user
+from app.service.quota_service import get_usage_rollups
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@router.get("/me", response_model=UsageReport)
+async def my_usage(
+    period: Period = "day",
+    limit: int = Query(30, ge=1, le=1440),
+    user: UserSchema = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Потребление текущего пользователя.
+
+    Args:
+        period: Гранулярность интервалов (minute, hour, day)
+        limit: Число последних интервалов
+        user: Текущий авторизованный пользователь
+        db: Сессия базы данных
+
+    Returns:
+        UsageReport: Состояние дневной квоты и интервалы потребления
+    """
+    rollups = await get_usage_rollups(db, user.id, period, limit)
+    return UsageReport(quota=quota_manager.status(user.id), rollups=rollups)
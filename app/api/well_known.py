@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Request, Response
+
+from app.core.config import settings
+from app.jwtauth.jwks import jwks_document
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json")
+async def jwks(request: Request):
+    """
+    Открытые ключи для локальной проверки JWT (RFC 7517).
+
+    Ответ кэшируется клиентами и прокси на `jwks_max_age_seconds`;
+    повторный запрос с `If-None-Match` получает 304 без тела.
+
+    Returns:
+        Response: JWKS с заголовками Cache-Control и ETag
+    """
+    body, etag = jwks_document()
+    max_age = settings.auth_settings.jwks_max_age_seconds
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={max_age}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
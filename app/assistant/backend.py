@@ -0,0 +1,108 @@
+"""
+Бэкенд генерации ответов ассистента.
+
+Бэкенд — любой объект с асинхронным генератором `stream(prompt, params)`,
+отдающим ответ частями. `LocalBackend` — детерминированная локальная
+заглушка с имитацией задержки модели; реальный клиент подключается через
+`set_backend`.
+
+Пакетный бэкенд (`BatchChatBackend`) генерирует ответы сразу для нескольких
+запросов и отдает пары (номер запроса в пакете, часть ответа).
+`LocalBatchBackend` — заглушка, у которой шаг генерации стоит фиксированные
+накладные расходы плюс небольшую надбавку за каждый запрос в пакете.
+"""
+
+import asyncio
+import hashlib
+from typing import AsyncIterator, Protocol, Sequence
+
+from pydantic import BaseModel, ConfigDict
+
+from app.core.config import settings
+
+
+class GenerationParams(BaseModel):
+    """Параметры генерации, влияющие на ответ модели."""
+
+    model_config = ConfigDict(frozen=True)
+
+    model: str = settings.assistant.model
+    temperature: float = settings.assistant.temperature
+    max_tokens: int = settings.assistant.max_tokens
+
+
+class ChatBackend(Protocol):
+    def stream(self, prompt: str, params: GenerationParams) -> AsyncIterator[str]: ...
+
+
+class BatchChatBackend(Protocol):
+    """Пакетный бэкенд: все запросы пакета обращаются к одной модели
+    (`params.model`), температура и `max_tokens` могут различаться.
+    """
+
+    def stream_batch(
+        self, items: Sequence[tuple[str, GenerationParams]]
+    ) -> AsyncIterator[tuple[int, str]]: ...
+
+
+class LocalBackend:
+    """Локальная заглушка модели.
+
+    Ответ зависит только от промпта и параметров; каждая часть отдается с
+    задержкой `token_delay`, чтобы стоимость генерации была заметна.
+    """
+
+    def __init__(self, token_delay: float = 0.01):
+        self.token_delay = token_delay
+
+    def reply_for(self, prompt: str, params: GenerationParams) -> list[str]:
+        digest = hashlib.sha256(f"{params.model}:{prompt}".encode()).hexdigest()
+        words = [f"{w} " for w in prompt.split()][: params.max_tokens - 1]
+        return ["Echo: "] + words + [f"[{digest[:8]}]"]
+
+    async def stream(self, prompt: str, params: GenerationParams) -> AsyncIterator[str]:
+        for chunk in self.reply_for(prompt, params):
+            await asyncio.sleep(self.token_delay)
+            yield chunk
+
+
+class LocalBatchBackend:
+    """Пакетная локальная заглушка модели.
+
+    На каждом шаге все незавершенные запросы пакета получают по одной части
+    ответа. Стоимость шага — `step_overhead + per_item_cost * n`, поэтому
+    пакетная обработка выгоднее поштучной. Ответы совпадают с `LocalBackend`.
+    """
+
+    def __init__(self, step_overhead: float = 0.01, per_item_cost: float = 0.0005):
+        self.step_overhead = step_overhead
+        self.per_item_cost = per_item_cost
+        self._replies = LocalBackend()
+
+    async def stream_batch(
+        self, items: Sequence[tuple[str, GenerationParams]]
+    ) -> AsyncIterator[tuple[int, str]]:
+        replies = [self._replies.reply_for(prompt, params) for prompt, params in items]
+        step = 0
+        while True:
+            active = [i for i, reply in enumerate(replies) if step < len(reply)]
+            if not active:
+                break
+            await asyncio.sleep(self.step_overhead + self.per_item_cost * len(active))
+            for i in active:
+                yield i, replies[i][step]
+            step += 1
+
+
+_backend: ChatBackend = LocalBackend()
+
+
+def get_backend() -> ChatBackend:
+    """Возвращает текущий бэкенд генерации."""
+    return _backend
+
+
+def set_backend(backend: ChatBackend) -> None:
+    """Подменяет бэкенд генерации."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,241 @@
+"""
+Планировщик микропакетов для вызовов модели.
+
+Запросы на генерацию копятся в очереди и отправляются в пакетный бэкенд
+пакетами не больше `max_batch_size`; самый старый запрос ждет не дольше
+`max_wait`. Очередь разбита на приоритетные полосы: пакет сначала набирается
+из полосы с меньшим номером. Внутри полосы запросы берутся по кругу между
+пользователями, поэтому один активный пользователь не вытесняет остальных.
+В один пакет попадают только запросы к одной модели (`params.model`): модель
+пакета задает первый выбранный запрос, запросы к другим моделям остаются в
+начале очереди до следующего пакета. Части ответа из пакета раздаются в очереди конкретных запросов.
+
+`BatchingBackend` оборачивает планировщик в интерфейс `ChatBackend`, так что
+он подключается под кэш ответов через `set_backend`. Пользователь и
+приоритет берутся из контекстных переменных `current_user` и
+`current_priority`.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator, Hashable, Optional
+
+from app.assistant.backend import BatchChatBackend, GenerationParams
+from app.core.config import settings
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+current_user: ContextVar[Hashable] = ContextVar("current_user", default=None)
+current_priority: ContextVar[Priority] = ContextVar(
+    "current_priority", default=Priority.INTERACTIVE
+)
+
+_END = object()
+
+
+class _Request:
+    __slots__ = ("prompt", "params", "user", "enqueued_at", "chunks", "dispatched")
+
+    def __init__(self, prompt: str, params: GenerationParams, user: Hashable):
+        self.prompt = prompt
+        self.params = params
+        self.user = user
+        self.enqueued_at = time.monotonic()
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.dispatched = False
+
+
+class MicroBatchScheduler:
+    """Собирает запросы в пакеты и раздает результаты.
+
+    Запускается `start()` и останавливается `stop()` внутри event loop
+    приложения (см. lifespan).
+    """
+
+    def __init__(
+        self,
+        backend: BatchChatBackend,
+        max_batch_size: int = settings.assistant.batch_max_size,
+        max_wait: float = settings.assistant.batch_max_wait_ms / 1000,
+        max_concurrent: int = settings.assistant.batch_max_concurrent,
+    ):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lanes: dict[Priority, OrderedDict[Hashable, deque[_Request]]] = {
+            p: OrderedDict() for p in Priority
+        }
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._loop_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.queue_wait_seconds = 0.0
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает сбор пакетов и дожидается уже запущенных."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+    async def submit(
+        self,
+        prompt: str,
+        params: GenerationParams,
+        user: Hashable = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[str]:
+        """Ставит запрос в очередь и отдает части ответа по мере генерации.
+
+        Если потребитель отменен до отправки запроса в пакет, запрос
+        снимается с очереди и не расходует место в пакете.
+        """
+        request = _Request(prompt, params, user)
+        self._lanes[priority].setdefault(user, deque()).append(request)
+        self._pending += 1
+        self._wakeup.set()
+        try:
+            while True:
+                chunk = await request.chunks.get()
+                if chunk is _END:
+                    return
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk
+        finally:
+            if not request.dispatched:
+                self._withdraw(request, priority)
+
+    def _withdraw(self, request: _Request, priority: Priority) -> None:
+        lane = self._lanes[priority]
+        queue = lane.get(request.user)
+        if queue is None:
+            return
+        queue.remove(request)
+        if not queue:
+            del lane[request.user]
+        self._pending -= 1
+        # Самый старый запрос мог смениться — пересчитать срок ожидания
+        self._wakeup.set()
+
+    def _oldest_enqueued(self) -> float:
+        return min(
+            queue[0].enqueued_at
+            for lane in self._lanes.values()
+            for queue in lane.values()
+        )
+
+    def _take_batch(self) -> list[_Request]:
+        batch: list[_Request] = []
+        model: Optional[str] = None
+        for priority in Priority:
+            lane = self._lanes[priority]
+            progress = True
+            while progress and len(batch) < self.max_batch_size:
+                progress = False
+                for user in list(lane):
+                    if len(batch) >= self.max_batch_size:
+                        break
+                    queue = lane[user]
+                    if model is None:
+                        model = queue[0].params.model
+                    elif queue[0].params.model != model:
+                        continue
+                    request = queue.popleft()
+                    request.dispatched = True
+                    batch.append(request)
+                    progress = True
+                    if queue:
+                        lane.move_to_end(user)
+                    else:
+                        del lane[user]
+        self._pending -= len(batch)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+            while 0 < self._pending < self.max_batch_size:
+                timeout = self._oldest_enqueued() + self.max_wait - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                self._wakeup.clear()
+
+            await self._slots.acquire()
+            batch = self._take_batch()
+            if not batch:
+                # Все ожидавшие запросы отменены
+                self._slots.release()
+                continue
+            if self._pending:
+                self._wakeup.set()
+            task = asyncio.create_task(self._execute(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _execute(self, batch: list[_Request]) -> None:
+        started = time.monotonic()
+        self.batches += 1
+        self.items += len(batch)
+        self.queue_wait_seconds += sum(started - r.enqueued_at for r in batch)
+        try:
+            items = [(r.prompt, r.params) for r in batch]
+            async for index, chunk in self.backend.stream_batch(items):
+                batch[index].chunks.put_nowait(chunk)
+        except Exception as exc:
+            for request in batch:
+                request.chunks.put_nowait(exc)
+        else:
+            for request in batch:
+                request.chunks.put_nowait(_END)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": self._pending,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "avg_queue_wait_ms": (
+                1000 * self.queue_wait_seconds / self.items if self.items else 0.0
+            ),
+        }
+
+
+class BatchingBackend:
+    """Адаптер `ChatBackend` поверх планировщика микропакетов."""
+
+    def __init__(self, scheduler: MicroBatchScheduler):
+        self.scheduler = scheduler
+
+    def stream(self, prompt: str, params: GenerationParams) -> AsyncIterator[str]:
+        return self.scheduler.submit(
+            prompt, params, user=current_user.get(), priority=current_priority.get()
+        )
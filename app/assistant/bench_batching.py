@@ -0,0 +1,80 @@
+"""
+Замер планировщика микропакетов на локальной заглушке модели.
+
+Запуск: `python -m app.assistant.bench_batching`
+
+Для каждой настройки (max_batch_size, max_wait) отправляет один и тот же
+поток запросов от нескольких пользователей и печатает пропускную способность,
+задержку ответа и время ожидания в очереди (добавленную задержку).
+"""
+
+import asyncio
+import random
+import statistics
+import time
+
+from app.assistant.backend import GenerationParams, LocalBatchBackend
+from app.assistant.batching import MicroBatchScheduler
+
+SETTINGS = [(1, 0.0), (4, 0.005), (8, 0.01), (16, 0.01), (32, 0.02)]
+REQUESTS = 300
+USERS = 10
+ARRIVAL_RATE = 500.0  # запросов в секунду
+
+
+async def _one(scheduler: MicroBatchScheduler, user: int, latencies: list[float]) -> None:
+    started = time.monotonic()
+    params = GenerationParams(max_tokens=8)
+    async for _ in scheduler.submit(f"question {user} about batching", params, user=user):
+        pass
+    latencies.append(time.monotonic() - started)
+
+
+async def run_setting(max_batch_size: int, max_wait: float) -> dict:
+    rng = random.Random(42)
+    scheduler = MicroBatchScheduler(
+        LocalBatchBackend(),
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        max_concurrent=2,
+    )
+    scheduler.start()
+    latencies: list[float] = []
+    tasks = []
+    started = time.monotonic()
+    for _ in range(REQUESTS):
+        tasks.append(asyncio.create_task(_one(scheduler, rng.randrange(USERS), latencies)))
+        await asyncio.sleep(rng.expovariate(ARRIVAL_RATE))
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+    await scheduler.stop()
+
+    latencies.sort()
+    stats = scheduler.stats()
+    return {
+        "batch": max_batch_size,
+        "wait_ms": max_wait * 1000,
+        "throughput": REQUESTS / elapsed,
+        "p50_ms": 1000 * statistics.median(latencies),
+        "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "avg_batch": stats["avg_batch_size"],
+        "queue_ms": stats["avg_queue_wait_ms"],
+    }
+
+
+async def main() -> None:
+    print(
+        f"{'batch':>5} {'wait_ms':>7} {'req/s':>8} {'p50_ms':>8} "
+        f"{'p95_ms':>8} {'avg_batch':>9} {'queue_ms':>8}"
+    )
+    for max_batch_size, max_wait in SETTINGS:
+        r = await run_setting(max_batch_size, max_wait)
+        print(
+            f"{r['batch']:>5} {r['wait_ms']:>7.1f} {r['throughput']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['avg_batch']:>9.2f} "
+            f"{r['queue_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+"""
+Кэш ответов ассистента с объединением одинаковых запросов (single-flight).
+
+Ключ — хэш нормализованного промпта, параметров генерации и хэша контекста.
+Ответ хранится как список частей, поэтому из кэша его можно воспроизвести
+потоком. Пока генерация по ключу идет, новые запросы с тем же ключом не
+вызывают модель, а читают части того же «полета» по мере их появления.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from app.assistant.backend import GenerationParams
+from app.core.config import settings
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Приводит промпт к канонической форме: NFC, casefold, схлопнутые пробелы."""
+    return " ".join(unicodedata.normalize("NFC", prompt).casefold().split())
+
+
+def context_hash(context: Sequence[str]) -> str:
+    """Хэш контекста диалога (предыдущих сообщений)."""
+    h = hashlib.sha256()
+    for message in context:
+        h.update(message.encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def cache_key(prompt: str, params: GenerationParams, context: Sequence[str] = ()) -> str:
+    raw = json.dumps(
+        {
+            "prompt": normalize_prompt(prompt),
+            "params": params.model_dump(),
+            "context": context_hash(context),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("chunks", "latency", "expires_at")
+
+    def __init__(self, chunks: list[str], latency: float, expires_at: float):
+        self.chunks = chunks
+        self.latency = latency
+        self.expires_at = expires_at
+
+
+class _Flight:
+    """Генерация в процессе: части, накопленные к текущему моменту."""
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self.changed = asyncio.Condition()
+
+
+class ResponseCache:
+    """LRU-кэш ответов с TTL и single-flight.
+
+    Все методы должны вызываться из одного event loop.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.assistant.cache_ttl_seconds,
+        max_entries: int = settings.assistant.cache_max_entries,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, chunks: list[str], latency: float) -> None:
+        self._entries[key] = _Entry(chunks, latency, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _run(
+        self, key: str, flight: _Flight, factory: Callable[[], AsyncIterator[str]]
+    ) -> None:
+        started = time.monotonic()
+        try:
+            async for chunk in factory():
+                flight.chunks.append(chunk)
+                async with flight.changed:
+                    flight.changed.notify_all()
+        except BaseException as exc:
+            flight.error = exc
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        else:
+            latency = time.monotonic() - started
+            self._put(key, flight.chunks, latency)
+            self.saved_seconds += latency * flight.followers
+        finally:
+            flight.done = True
+            self._flights.pop(key, None)
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    async def _tail(self, flight: _Flight) -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            async with flight.changed:
+                await flight.changed.wait_for(
+                    lambda: flight.done or len(flight.chunks) > sent
+                )
+            while sent < len(flight.chunks):
+                yield flight.chunks[sent]
+                sent += 1
+            if flight.done:
+                break
+        if flight.error is not None:
+            raise RuntimeError("Generation failed") from flight.error
+
+    async def _replay(self, chunks: list[str]) -> AsyncIterator[str]:
+        for chunk in chunks:
+            yield chunk
+
+    def open(
+        self, key: str, factory: Callable[[], AsyncIterator[str]]
+    ) -> tuple[AsyncIterator[str], bool]:
+        """Возвращает поток ответа и признак того, что модель для него не вызывалась.
+
+        Ответ берется из кэша, из уже идущей генерации с тем же ключом или из
+        новой генерации. Генерация выполняется в отдельной задаче, поэтому
+        обрыв клиента не прерывает ее для остальных ожидающих и не мешает
+        сохранению в кэш.
+        """
+        self.requests += 1
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            self.saved_seconds += entry.latency
+            return self._replay(entry.chunks), True
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            flight.followers += 1
+            return self._tail(flight), True
+
+        flight = _Flight()
+        self._flights[key] = flight
+        task = asyncio.create_task(self._run(key, flight, factory))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return self._tail(flight), False
+
+    async def get_or_generate(
+        self, key: str, factory: Callable[[], AsyncIterator[str]]
+    ) -> tuple[str, bool]:
+        """Возвращает полный ответ и признак попадания в кэш/идущую генерацию."""
+        chunks, cached = self.open(key, factory)
+        return "".join([chunk async for chunk in chunks]), cached
+
+    def stats(self) -> dict:
+        served = self.hits + self.coalesced
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.requests - served,
+            "hit_ratio": served / self.requests if self.requests else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": len(self._entries),
+            "in_flight": len(self._flights),
+        }
+
+
+response_cache = ResponseCache()
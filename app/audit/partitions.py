@@ -0,0 +1,70 @@
+"""
+Обслуживание месячных секций таблицы `audit_events` (только PostgreSQL).
+
+Секции называются `audit_events_pYYYYMM` и покрывают [начало месяца,
+начало следующего месяца). Заранее создаются секции на
+`partitions_ahead_months` вперед; секции старше `retention_months`
+удаляются целиком.
+"""
+
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.models.audit_models import AuditEvent
+
+_PARENT = AuditEvent.__tablename__
+_PARTITION_RE = re.compile(rf"^{_PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month_start: datetime) -> str:
+    return f"{_PARENT}_p{month_start:%Y%m}"
+
+
+async def _existing_partitions(conn: AsyncConnection) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": _PARENT},
+    )
+    return [row[0] for row in result]
+
+
+async def maintain_partitions(
+    conn: AsyncConnection,
+    now: datetime | None = None,
+    ahead: int = settings.audit.partitions_ahead_months,
+    retention: int = settings.audit.retention_months,
+) -> None:
+    """Создает недостающие секции и удаляет устаревшие."""
+    if conn.dialect.name != "postgresql":
+        return
+    month = _add_months(now or datetime.now(timezone.utc), 0)
+
+    for offset in range(ahead + 1):
+        start = _add_months(month, offset)
+        end = _add_months(month, offset + 1)
+        await conn.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{partition_name(start)}" '
+                f'PARTITION OF "{_PARENT}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+    oldest_kept = partition_name(_add_months(month, -retention))
+    for name in await _existing_partitions(conn):
+        if _PARTITION_RE.match(name) and name < oldest_kept:
+            await conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
@@ -0,0 +1,180 @@
+"""
+Журнал безопасности с отложенной пакетной записью.
+
+События кладутся в ограниченную asyncio-очередь и не задерживают запрос.
+Фоновая задача забирает их пакетами — по `batch_size` событий или по
+истечении `flush_interval_seconds` с первого события пакета — и вставляет
+одним executemany. При переполнении очереди действует политика
+`overflow`: `drop` (событие отбрасывается, растет счетчик `dropped`) или
+`block` (вызывающий ждет места); об отбрасывании пишется предупреждение в
+лог, не чаще раза в `_DROP_WARNING_INTERVAL_SECONDS`. Если вставка пакета не
+удалась, секции проверяются заново и вставка повторяется один раз. Счетчики
+доступны через `stats()` (эндпоинт `/health/audit`). При остановке в очередь
+ставится маркер, и задача дописывает все, что было до него.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import Request
+from sqlalchemy import insert
+
+from app.audit.partitions import maintain_partitions
+from app.core.config import settings
+from app.db.database import async_engine, async_session
+from app.models.audit_models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+LOGIN_SUCCESS = "login_success"
+LOGIN_FAILED = "login_failed"
+REGISTER = "register"
+REGISTER_FAILED = "register_failed"
+TOKEN_REFRESH = "token_refresh"
+
+_STOP = object()
+_MAINTENANCE_INTERVAL_SECONDS = 60 * 60
+_DROP_WARNING_INTERVAL_SECONDS = 60
+
+
+class AuditLog:
+    def __init__(
+        self,
+        queue_size: int = settings.audit.queue_size,
+        batch_size: int = settings.audit.batch_size,
+        flush_interval: float = settings.audit.flush_interval_seconds,
+        overflow: str = settings.audit.overflow,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self._maintenance: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._last_drop_warning = 0.0
+
+    async def emit(
+        self,
+        event_type: str,
+        request: Optional[Request] = None,
+        user_id: Optional[UUID] = None,
+        username: Optional[str] = None,
+        detail: Optional[str] = None,
+    ) -> None:
+        """Ставит событие в очередь на запись."""
+        ip = user_agent = None
+        if request is not None:
+            ip = request.client.host if request.client else None
+            user_agent = (request.headers.get("user-agent") or "")[:255] or None
+        # Пакетная вставка идет через Core insert, поэтому id задается здесь.
+        event: Dict[str, Any] = {
+            "id": uuid4(),
+            "occurred_at": datetime.now(timezone.utc),
+            "event_type": event_type,
+            "user_id": user_id,
+            "username": username[:50] if username else None,
+            "ip": ip,
+            "user_agent": user_agent,
+            "detail": detail,
+        }
+        if self.overflow == "block":
+            await self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_warning >= _DROP_WARNING_INTERVAL_SECONDS:
+                self._last_drop_warning = now
+                logger.warning(
+                    "Audit queue is full, %d events dropped so far", self.dropped
+                )
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> None:
+        async with async_session() as session:
+            await session.execute(insert(AuditEvent), batch)
+            await session.commit()
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await self._insert(batch)
+        except Exception:
+            # Чаще всего — нет секции для текущего месяца
+            logger.warning("Audit insert failed, retrying after partition check")
+            try:
+                async with async_engine.begin() as conn:
+                    await maintain_partitions(conn)
+                await self._insert(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Failed to write %d audit events", len(batch))
+                return
+        self.written += len(batch)
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            event = await self._queue.get()
+            if event is _STOP:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is _STOP:
+                    closing = True
+                    break
+                batch.append(event)
+            await self._write(batch)
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(_MAINTENANCE_INTERVAL_SECONDS)
+            try:
+                async with async_engine.begin() as conn:
+                    await maintain_partitions(conn)
+            except Exception:
+                logger.exception("Audit partition maintenance failed")
+
+    async def start(self) -> None:
+        """Готовит секции таблицы и запускает фоновые задачи."""
+        async with async_engine.begin() as conn:
+            await maintain_partitions(conn)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        """Дописывает оставшиеся в очереди события и останавливает задачи."""
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            self._maintenance = None
+        if self._writer is not None:
+            await self._queue.put(_STOP)
+            await self._writer
+            self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+audit_log = AuditLog()
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 from pydantic import BaseModel
 from pydantic.v1 import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -12,11 +13,123 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 class AuthSettings(BaseModel):
     private_key: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key: Path = BASE_DIR / "certs" / "jwt-public.pem"
+    # Предыдущие открытые ключи, которые еще публикуются в JWKS при ротации
+    extra_public_keys: list[Path] = []
     algorithm: str = "RS256"
     access_token_expires_minutes: int = 3
     refresh_token_expires_minutes: int = 60 * 24 * 14  # 14 дней по умолчанию
     issuer: str = "ai-assistant-chat"
     audience: str = "ai-assistant-clients"
+    jwks_max_age_seconds: int = 60 * 60
+    introspect_max_tokens: int = 500
+    # Сервисы с доступом к /auth/introspect: client_id -> sha256(secret) в hex.
+    # Проверяются по HTTP Basic; пустой словарь закрывает эндпоинт полностью.
+    introspect_clients: dict[str, str] = {}
+    # Пользователи с доступом к /admin
+    admin_usernames: list[str] = []
+
+
+class SearchSettings(BaseModel):
+    index_dir: Path = BASE_DIR / "data" / "vector_index"
+    embedding_dim: int = 256
+    ivf_min_vectors: int = 50_000  # начиная с этого размера строим IVF
+    ivf_nprobe: int = 8
+    max_top_k: int = 100
+    snippet_chars: int = 200
+    # Сколько индексов пользователей держать открытыми в воркере (LRU)
+    max_open_indexes: int = 256
+
+
+class AssistantSettings(BaseModel):
+    model: str = "local"
+    max_tokens: int = 512
+    temperature: float = 0.0
+    cache_ttl_seconds: int = 60 * 60
+    cache_max_entries: int = 10_000
+    batching_enabled: bool = False
+    batch_max_size: int = 16
+    batch_max_wait_ms: int = 10
+    batch_max_concurrent: int = 2
+
+
+class QuotaSettings(BaseModel):
+    daily_requests_soft: int = 800
+    daily_requests_hard: int = 1000
+    daily_tokens_soft: int = 160_000
+    daily_tokens_hard: int = 200_000
+    flush_interval_seconds: float = 5.0
+    shards: int = 16
+
+
+class AuditSettings(BaseModel):
+    queue_size: int = 10_000
+    batch_size: int = 500
+    flush_interval_seconds: float = 1.0
+    # drop — при переполнении очереди событие отбрасывается и учитывается в
+    # счетчике; block — запрос ждет места в очереди (backpressure)
+    overflow: Literal["drop", "block"] = "drop"
+    partitions_ahead_months: int = 2
+    retention_months: int = 12
+
+
+class HealthSettings(BaseModel):
+    probe_interval_seconds: float = 2.0
+    db_timeout_seconds: float = 1.0
+    pool_saturation_threshold: float = 0.9
+    loop_lag_threshold_ms: int = 200
+    # Результат старше этого считается недействительным (проба зависла)
+    stale_after_seconds: float = 10.0
+
+
+class AdmissionGroup(BaseModel):
+    prefixes: list[str] = []
+    initial_limit: int = 32
+    min_limit: int = 2
+    max_limit: int = 256
+    max_queue: int = 64
+    queue_timeout_ms: int = 500
+    target_latency_ms: int = 250
+
+
+class AdmissionSettings(BaseModel):
+    enabled: bool = True
+    retry_after_seconds: int = 1
+    # Пути вне контроля допуска (точное совпадение)
+    exempt_paths: list[str] = ["/api/v1/health/live"]
+    # Запросы, не подошедшие ни под один префикс, попадают в группу "default"
+    groups: dict[str, AdmissionGroup] = {
+        "health": AdmissionGroup(
+            prefixes=["/api/v1/health"],
+            initial_limit=8,
+            max_limit=32,
+            max_queue=16,
+            queue_timeout_ms=100,
+            target_latency_ms=50,
+        ),
+        "auth": AdmissionGroup(
+            # bcrypt занимает ~200-300 мс CPU на запрос
+            prefixes=["/api/v1/auth", "/.well-known"],
+            initial_limit=16,
+            max_limit=64,
+            target_latency_ms=500,
+            queue_timeout_ms=1000,
+        ),
+        "introspect": AdmissionGroup(
+            # Один вызов проверяет до `introspect_max_tokens` подписей, поэтому
+            # эндпоинт отделен от логина и ограничен сильнее
+            prefixes=["/api/v1/auth/introspect"],
+            initial_limit=4,
+            max_limit=16,
+            max_queue=16,
+            target_latency_ms=500,
+        ),
+        "chat": AdmissionGroup(
+            prefixes=["/api/v1/chat", "/api/v1/search", "/api/v1/usage"],
+            target_latency_ms=2000,
+            queue_timeout_ms=2000,
+        ),
+        "default": AdmissionGroup(),
+    }
 
 
 class DatabaseSettings(BaseSettings):
@@ -29,6 +142,12 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=BASE_DIR / ".env", extra="ignore")
     auth_settings: AuthSettings = AuthSettings()
     database: DatabaseSettings = DatabaseSettings()
+    search: SearchSettings = SearchSettings()
+    assistant: AssistantSettings = AssistantSettings()
+    quota: QuotaSettings = QuotaSettings()
+    admission: AdmissionSettings = AdmissionSettings()
+    audit: AuditSettings = AuditSettings()
+    health: HealthSettings = HealthSettings()
 
 
 settings = Settings()
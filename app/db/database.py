@@ -1,10 +1,15 @@
+import logging
+import re
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.schema import CreateIndex
 from sqlmodel.ext.asyncio.session import (
     AsyncSession,
 )
 from app.core.config import settings
+from app.db.base_class import BaseModel
 
 async_engine = create_async_engine(
     settings.database.db_url,
@@ -23,3 +28,68 @@ async_session = async_sessionmaker(
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+logger = logging.getLogger(__name__)
+
+_INDEX_LOCK = "hashtext('ai_assistant_chat:create_missing_indexes')"
+_CREATE_INDEX_RE = re.compile(r"^CREATE (UNIQUE )?INDEX ")
+
+
+def _create_indexes_checkfirst(connection) -> None:
+    for table in BaseModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+async def create_missing_indexes() -> None:
+    """Досоздает индексы, объявленные в моделях.
+
+    `create_all` не добавляет индексы к уже существующим таблицам. В
+    PostgreSQL индексы строятся `CREATE INDEX CONCURRENTLY IF NOT EXISTS` в
+    режиме autocommit — без блокировки записи в таблицу. Строит один воркер:
+    остальные не получают advisory lock и пропускают шаг. Невалидный индекс,
+    оставшийся от прерванной сборки, удаляется и строится заново.
+    Секционированные таблицы пропускаются: их индексы создаются вместе с
+    таблицей, а CONCURRENTLY для них не поддерживается.
+
+    Вызывается фоновой задачей при старте; ошибки пишутся в лог.
+    """
+    try:
+        async with async_engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                await conn.run_sync(_create_indexes_checkfirst)
+                await conn.commit()
+                return
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = await conn.scalar(text(f"SELECT pg_try_advisory_lock({_INDEX_LOCK})"))
+            if not locked:
+                return
+            try:
+                invalid = set(
+                    await conn.scalars(
+                        text(
+                            "SELECT c.relname FROM pg_index i "
+                            "JOIN pg_class c ON c.oid = i.indexrelid "
+                            "WHERE NOT i.indisvalid"
+                        )
+                    )
+                )
+                for table in BaseModel.metadata.sorted_tables:
+                    if table.kwargs.get("postgresql_partition_by"):
+                        continue
+                    for index in table.indexes:
+                        if index.name in invalid:
+                            await conn.exec_driver_sql(
+                                f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'
+                            )
+                        ddl = str(
+                            CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect)
+                        )
+                        await conn.exec_driver_sql(
+                            _CREATE_INDEX_RE.sub(r"CREATE \1INDEX CONCURRENTLY ", ddl, count=1)
+                        )
+            finally:
+                await conn.execute(text(f"SELECT pg_advisory_unlock({_INDEX_LOCK})"))
+    except Exception:
+        logger.exception("Failed to create missing indexes")
@@ -1,6 +1,7 @@
-from .base_ex import AuthException, ForbiddenException
+from .base_ex import AuthException, ForbiddenException, TooManyRequestsException
 
 __all__ = [
     "AuthException",
     "ForbiddenException",
+    "TooManyRequestsException",
 ]
@@ -18,3 +18,7 @@ class ForbiddenException(BaseEx):
 
 class BadRequestException(BaseEx):
     pass
+
+
+class TooManyRequestsException(BaseEx):
+    pass
@@ -0,0 +1,70 @@
+"""
+Публикация открытых ключей в формате JWKS (RFC 7517).
+
+Сервисы-потребители проверяют токены локально по ключам из
+`/.well-known/jwks.json` и выбирают ключ по заголовку `kid` токена.
+`kid` — отпечаток ключа по RFC 7638, поэтому он стабилен между запусками
+и воркерами. Помимо текущего ключа публикуются ключи из
+`AuthSettings.extra_public_keys` (ротация).
+"""
+
+import base64
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+from jwt.algorithms import get_default_algorithms
+
+from app.core.config import settings
+
+# Обязательные поля JWK для отпечатка (RFC 7638, раздел 3.2).
+_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def public_jwk(public_pem: str, algorithm: str = settings.auth_settings.algorithm) -> Dict[str, Any]:
+    """Строит JWK открытого ключа с `kid`, `use` и `alg`."""
+    alg = get_default_algorithms()[algorithm]
+    jwk = alg.to_jwk(alg.prepare_key(public_pem), as_dict=True)
+    members = {k: jwk[k] for k in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    kid = base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).rstrip(b"=").decode()
+    return {**jwk, "kid": kid, "use": "sig", "alg": algorithm}
+
+
+def key_id(public_pem: str, algorithm: str = settings.auth_settings.algorithm) -> str:
+    return public_jwk(public_pem, algorithm)["kid"]
+
+
+def _public_key_paths() -> list[Path]:
+    auth = settings.auth_settings
+    return [auth.public_key, *auth.extra_public_keys]
+
+
+@lru_cache(maxsize=1)
+def verification_keys() -> Dict[str, Any]:
+    """Разобранные открытые ключи по `kid` — чтобы не парсить PEM на каждый токен."""
+    alg = get_default_algorithms()[settings.auth_settings.algorithm]
+    keys = {}
+    for path in _public_key_paths():
+        pem = path.read_text()
+        keys[key_id(pem)] = alg.prepare_key(pem)
+    return keys
+
+
+@lru_cache(maxsize=1)
+def jwks_document() -> tuple[bytes, str]:
+    """Возвращает сериализованный JWKS и его ETag.
+
+    Ключи читаются с диска один раз; для применения новых ключей нужен
+    перезапуск воркеров.
+    """
+    keys = [public_jwk(path.read_text()) for path in _public_key_paths()]
+    body = json.dumps({"keys": keys}, separators=(",", ":")).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
@@ -2,7 +2,8 @@
 Утилиты для работы с JWT (кодирование/декодирование, пароли).
 
 Добавляет `iss`, `aud`, `iat`, `exp` в токены. Проверяет `iss` и `aud` при
-декодировании. Хэширование паролей — через bcrypt.
+декодировании. Назначение токена передается в claim `token_type`
+(`access` или `refresh`). Хэширование паролей — через bcrypt.
 """
 
 from datetime import datetime, timedelta
@@ -11,6 +12,11 @@ from typing import Any, Dict, Optional
 import bcrypt
 import jwt as pyjwt
 from app.core.config import settings
+from app.jwtauth.jwks import key_id
+
+TOKEN_TYPE_FIELD = "token_type"
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 
 def encode_jwt(
@@ -21,6 +27,7 @@ def encode_jwt(
     expires_timedelta: Optional[timedelta] = None,
     issuer: str = settings.auth_settings.issuer,
     audience: str = settings.auth_settings.audience,
+    kid: str = key_id(settings.auth_settings.public_key.read_text()),
 ) -> str:
     """
     Кодирует JWT токен с указанными параметрами.
@@ -33,6 +40,7 @@ def encode_jwt(
         expires_timedelta: Альтернативный способ указания времени жизни
         issuer: Издатель токена
         audience: Аудитория токена
+        kid: Идентификатор ключа подписи из JWKS (заголовок `kid`)
         
     Returns:
         str: Закодированный JWT токен
@@ -45,6 +53,7 @@ def encode_jwt(
         to_encode,
         private_key,
         algorithm=algorithm,
+        headers={"kid": kid},
     )
     return token
 
@@ -1,3 +1,4 @@
+import asyncio
 import uvicorn
 import logging
 from contextlib import asynccontextmanager
@@ -6,9 +7,17 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1 import router
-from app.db.database import async_engine
+from app.api.well_known import router as well_known_router
+from app.assistant.backend import LocalBatchBackend, set_backend
+from app.assistant.batching import BatchingBackend, MicroBatchScheduler
+from app.audit.writer import audit_log
+from app.core.config import settings
+from app.quota.manager import quota_manager
+from app.tasks.health_probe import dependency_probe
+from app.db.database import async_engine, create_missing_indexes
 from app.db.base_class import BaseModel
 from app.exceptions.base_ex import BaseEx
+from app.middleware.admission import AdmissionControlMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,12 +28,41 @@ async def lifespan(app: FastAPI):
     """
     Управляет жизненным циклом приложения FastAPI.
     
-    При запуске приложения создает все таблицы в базе данных.
-    При завершении работы приложения выполняет очистку ресурсов.
+    При запуске приложения создает таблицы в базе данных и секции журнала
+    безопасности, в фоне досоздает недостающие индексы, запускает фоновую
+    запись журнала, сброс счетчиков квот, фоновую проверку зависимостей для
+    readiness и, если включено, планировщик пакетной генерации. При
+    завершении работы останавливает проверку, дописывает журнал, сбрасывает
+    остаток счетчиков и выполняет очистку ресурсов.
+
+    Shutdown выполняется, когда uvicorn уже не принимает соединения, поэтому
+    вывести воркер из ротации отсюда нельзя — это делает оркестратор
+    (preStop-задержка до SIGTERM).
     """
     async with async_engine.begin() as conn:
         await conn.run_sync(BaseModel.metadata.create_all)
+
+    scheduler = None
+    if settings.assistant.batching_enabled:
+        scheduler = MicroBatchScheduler(LocalBatchBackend())
+        scheduler.start()
+        set_backend(BatchingBackend(scheduler))
+    await audit_log.start()
+    quota_manager.start()
+    await dependency_probe.start()
+    # Сборка индекса на большой таблице может идти минутами — старт не ждет ее
+    index_task = asyncio.create_task(create_missing_indexes())
     yield
+    await dependency_probe.stop()
+    index_task.cancel()
+    try:
+        await index_task
+    except asyncio.CancelledError:
+        pass
+    await quota_manager.stop()
+    await audit_log.stop()
+    if scheduler is not None:
+        await scheduler.stop()
 
 
 app = FastAPI(
@@ -32,15 +70,8 @@ app = FastAPI(
 )
 
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 app.include_router(router)
+app.include_router(well_known_router)
 
 
 @app.exception_handler(BaseEx)
@@ -69,5 +100,21 @@ async def log_request(request: Request, call_next):
     return await call_next(request)
 
 
+# Добавлен после остальных, поэтому выполняется раньше них: отклоненные
+# запросы не читают тело и не доходят до остальных middleware.
+app.add_middleware(AdmissionControlMiddleware)
+
+# Самый внешний: CORS-заголовки получают и ответы 503 от контроля допуска,
+# а preflight-запросы не расходуют лимиты.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Message-Id", "X-Quota-Warning"],
+)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, reload=True)
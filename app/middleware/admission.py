@@ -0,0 +1,206 @@
+"""
+Контроль допуска запросов и сброс нагрузки.
+
+У каждой группы маршрутов (auth, chat, health, ...) свой лимит одновременно
+выполняемых запросов и своя ограниченная очередь ожидания. Лимит
+подстраивается по схеме AIMD: если запрос уложился в целевую задержку,
+лимит растет примерно на единицу за «окно» из `limit` запросов; если нет или
+ответ завершился ошибкой 5xx (быстро падающая БД — тоже перегрузка) —
+умножается на `backoff` (не чаще одного раза за целевую задержку, чтобы
+одна волна медленных ответов не обнуляла лимит).
+
+Запрос, которому не нашлось места в очереди или который не дождался
+допуска за `queue_timeout_ms`, сразу получает 503 с `Retry-After` — вместо
+того чтобы медленно стареть в очереди воркера. Группы изолированы, поэтому
+перегрузка БД или bcrypt не задевает `/health`.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import AdmissionGroup, settings
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, config: AdmissionGroup, backoff: float = 0.9):
+        self.name = name
+        self.min_limit = config.min_limit
+        self.max_limit = config.max_limit
+        self.max_queue = config.max_queue
+        self.queue_timeout = config.queue_timeout_ms / 1000
+        self.target_latency = config.target_latency_ms / 1000
+        self.backoff = backoff
+        self.limit = float(config.initial_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.admitted = 0
+        self.rejected = 0
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self) -> bool:
+        """Ждет свободного места; False — запрос нужно отклонить."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Клиент ушел: место, если его уже выдали, нужно вернуть.
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                self._drop_waiter(waiter)
+            raise
+        if not waiter.done():
+            self._drop_waiter(waiter)
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def _drop_waiter(self, waiter: asyncio.Future) -> None:
+        # Иначе отмененное ожидание продолжит занимать место в очереди
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, latency: Optional[float], failed: bool = False) -> None:
+        """Освобождает место и корректирует лимит.
+
+        `failed=True` (ответ 5xx или исключение) уменьшает лимит независимо
+        от задержки; `latency=None` без `failed` — без корректировки.
+        """
+        self.in_flight -= 1
+        if failed:
+            self._decrease()
+        elif latency is not None:
+            self._adjust(latency)
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.cancelled():
+                continue
+            self.in_flight += 1
+            waiter.set_result(True)
+
+    def _adjust(self, latency: float) -> None:
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": sum(1 for w in self._waiters if not w.cancelled()),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        groups: dict[str, AdmissionGroup] = settings.admission.groups,
+        exempt_paths: list[str] = settings.admission.exempt_paths,
+    ):
+        self.exempt_paths = set(exempt_paths)
+        self.limiters = {name: AdaptiveLimiter(name, cfg) for name, cfg in groups.items()}
+        # Самые длинные префиксы проверяются первыми
+        self._prefixes = sorted(
+            ((prefix, name) for name, cfg in groups.items() for prefix in cfg.prefixes),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def limiter_for(self, path: str) -> Optional[AdaptiveLimiter]:
+        """Лимитер группы маршрута; None — запрос проходит без контроля."""
+        if path in self.exempt_paths:
+            return None
+        for prefix, name in self._prefixes:
+            if path.startswith(prefix):
+                return self.limiters[name]
+        return self.limiters.get("default")
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """ASGI-middleware: допуск по группе маршрута, 503 при перегрузке.
+
+    Задержка для AIMD измеряется до `http.response.start` (время до первого
+    байта): длительность потоковой отдачи зависит от клиента и длины ответа,
+    а не от перегрузки. Место в группе занято до конца ответа. Ответы 5xx и
+    исключения считаются сигналом перегрузки.
+
+    Должен стоять внутри CORSMiddleware, иначе браузер не прочитает 503 и
+    `Retry-After`.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admission.enabled:
+            await self.app(scope, receive, send)
+            return
+        limiter = self.controller.limiter_for(scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Service overloaded, retry later"},
+                headers={"Retry-After": str(settings.admission.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        latency: Optional[float] = None
+        failed = False
+
+        async def send_timed(message: Message) -> None:
+            nonlocal latency, failed
+            if message["type"] == "http.response.start":
+                latency = time.monotonic() - started
+                failed = message["status"] >= 500
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            limiter.release(latency, failed)
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+from app.db.base_class import BaseModel
+from sqlalchemy import Column, DateTime, Index, String
+from sqlmodel import Field
+
+
+class AuditEvent(BaseModel, table=True):
+    """Событие журнала безопасности: вход, неудачная попытка, регистрация,
+    обновление токена.
+
+    Таблица секционирована по месяцам (`occurred_at`), поэтому старые данные
+    удаляются целыми секциями (DROP TABLE), без DELETE и VACUUM. Ключ
+    секционирования обязан входить в первичный ключ. Внешнего ключа на
+    `users` нет намеренно: журнал переживает удаление пользователя.
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_user_id_occurred_at", "user_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    occurred_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), primary_key=True),
+    )
+    event_type: str = Field(sa_column=Column(String(32), nullable=False))
+    user_id: Optional[UUID] = Field(default=None, nullable=True)
+    username: Optional[str] = Field(
+        default=None, sa_column=Column(String(50), nullable=True)
+    )
+    ip: Optional[str] = Field(default=None, sa_column=Column(String(45), nullable=True))
+    user_agent: Optional[str] = Field(
+        default=None, sa_column=Column(String(255), nullable=True)
+    )
+    detail: Optional[str] = Field(
+        default=None, sa_column=Column(String(255), nullable=True)
+    )
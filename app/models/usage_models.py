@@ -0,0 +1,25 @@
+from datetime import datetime
+from uuid import UUID
+
+from app.db.base_class import BaseModel
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlmodel import Field
+
+
+class UsageRollup(BaseModel, table=True):
+    """Агрегированное потребление пользователя за интервал.
+
+    Одна строка на (пользователь, период, начало интервала), где период —
+    `minute`, `hour` или `day`. Счетчики только увеличиваются: воркеры
+    периодически добавляют к ним накопленные в памяти приращения.
+    """
+
+    __tablename__ = "usage_rollups"
+
+    user_id: UUID = Field(foreign_key="users.id", primary_key=True)
+    period: str = Field(sa_column=Column(String(8), primary_key=True))
+    bucket_start: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), primary_key=True)
+    )
+    requests: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    tokens: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
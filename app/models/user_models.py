@@ -2,7 +2,7 @@ from typing import Optional
 from uuid import UUID, uuid4
 
 from app.db.base_class import BaseModel
-from sqlalchemy import String, Boolean, Column, LargeBinary
+from sqlalchemy import String, Boolean, Column, Index, LargeBinary, func
 from sqlmodel import Field
 
 
@@ -26,3 +26,11 @@ class Users(BaseModel, table=True):
     )
     password: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
     is_active: bool = Field(default=True, sa_column=Column(Boolean, nullable=False))
+
+
+# Индексы для административного поиска. Префиксный поиск идет диапазоном
+# по lower(...) в collation "C": порядок байт совпадает с префиксным, и
+# индекс используется в том числе в generic-планах prepared statements.
+Index("ix_users_created_at_id", Users.created_at, Users.id)
+Index("ix_users_username_lower_c", func.lower(Users.username).collate("C"))
+Index("ix_users_email_lower_c", func.lower(Users.email).collate("C"))
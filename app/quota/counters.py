@@ -0,0 +1,67 @@
+"""
+Шардированные счетчики потребления в памяти воркера.
+
+Приращения группируются по (пользователь, минута). Шард выбирается по
+хэшу пользователя, у каждого шарда своя блокировка, поэтому запись из
+разных потоков threadpool почти не конкурирует. `drain()` атомарно
+забирает накопленные приращения для сброса в БД.
+"""
+
+import threading
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.core.config import settings
+
+# (user_id, начало минуты) -> [requests, tokens]
+Deltas = dict[tuple[UUID, datetime], list[int]]
+
+
+def minute_bucket(moment: datetime) -> datetime:
+    return moment.replace(second=0, microsecond=0)
+
+
+class ShardedCounters:
+    def __init__(self, shards: int = settings.quota.shards):
+        self._shards: list[Deltas] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard(self, user_id: UUID) -> int:
+        return hash(user_id) % len(self._shards)
+
+    def add(self, user_id: UUID, requests: int = 0, tokens: int = 0) -> None:
+        key = (user_id, minute_bucket(datetime.now(timezone.utc)))
+        i = self._shard(user_id)
+        with self._locks[i]:
+            counter = self._shards[i].setdefault(key, [0, 0])
+            counter[0] += requests
+            counter[1] += tokens
+
+    def merge(self, deltas: Deltas) -> None:
+        """Возвращает приращения обратно (например, если сброс в БД не удался)."""
+        for (user_id, bucket), (requests, tokens) in deltas.items():
+            i = self._shard(user_id)
+            with self._locks[i]:
+                counter = self._shards[i].setdefault((user_id, bucket), [0, 0])
+                counter[0] += requests
+                counter[1] += tokens
+
+    def drain(self) -> Deltas:
+        """Забирает все накопленные приращения и обнуляет счетчики."""
+        drained: Deltas = {}
+        for i in range(len(self._shards)):
+            with self._locks[i]:
+                shard, self._shards[i] = self._shards[i], {}
+            drained.update(shard)
+        return drained
+
+    def totals_since(self, user_id: UUID, since: datetime) -> tuple[int, int]:
+        """Сумма несброшенных приращений пользователя начиная с `since`."""
+        i = self._shard(user_id)
+        requests = tokens = 0
+        with self._locks[i]:
+            for (uid, bucket), (r, t) in self._shards[i].items():
+                if uid == user_id and bucket >= since:
+                    requests += r
+                    tokens += t
+        return requests, tokens
@@ -0,0 +1,185 @@
+"""
+Квоты пользователей с отложенной записью потребления в БД.
+
+Запросы и токены учитываются в `ShardedCounters` воркера. Фоновая задача
+раз в `flush_interval_seconds` забирает приращения, сворачивает их в
+минутные, часовые и дневные интервалы и одним пакетным upsert'ом добавляет
+к `usage_rollups`. После сброса перечитываются дневные итоги затронутых
+пользователей — это глобальное представление, общее для всех воркеров.
+
+Проверка квоты: итог из БД + приращения в процессе сброса + несброшенные
+локальные приращения. Представление согласовано в конечном счете: вклад
+других воркеров виден с задержкой до одного интервала сброса. При падении
+воркера теряется не больше одного интервала.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.database import async_session
+from app.models.usage_models import UsageRollup
+from app.quota.counters import Deltas, ShardedCounters
+from app.schemas.usageschema import QuotaStatus
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("minute", "hour", "day")
+# Ограничение Postgres на число параметров запроса — 32767.
+_UPSERT_CHUNK = 1000
+
+
+def bucket_start(moment: datetime, period: str) -> datetime:
+    if period == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def rollup(deltas: Deltas) -> dict[tuple[UUID, str, datetime], list[int]]:
+    """Сворачивает минутные приращения во все периоды."""
+    rows: dict[tuple[UUID, str, datetime], list[int]] = {}
+    for (user_id, minute), (requests, tokens) in deltas.items():
+        for period in PERIODS:
+            row = rows.setdefault((user_id, period, bucket_start(minute, period)), [0, 0])
+            row[0] += requests
+            row[1] += tokens
+    return rows
+
+
+def _upsert(rows: list[dict]):
+    stmt = insert(UsageRollup).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "period", "bucket_start"],
+        set_={
+            "requests": UsageRollup.requests + stmt.excluded.requests,
+            "tokens": UsageRollup.tokens + stmt.excluded.tokens,
+            "updated_at": func.now(),
+        },
+    )
+
+
+class QuotaManager:
+    def __init__(
+        self,
+        session_factory=async_session,
+        flush_interval: float = settings.quota.flush_interval_seconds,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.counters = ShardedCounters()
+        # user_id -> (начало дня, requests, tokens) по данным БД
+        self._global: dict[UUID, tuple[datetime, int, int]] = {}
+        self._flushing: Deltas = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: UUID, requests: int = 0, tokens: int = 0) -> None:
+        self.counters.add(user_id, requests=requests, tokens=tokens)
+
+    def usage_today(self, user_id: UUID) -> tuple[int, int]:
+        day = bucket_start(datetime.now(timezone.utc), "day")
+        requests = tokens = 0
+        snapshot = self._global.get(user_id)
+        if snapshot is not None and snapshot[0] == day:
+            requests, tokens = snapshot[1], snapshot[2]
+        for (uid, minute), (r, t) in self._flushing.items():
+            if uid == user_id and minute >= day:
+                requests += r
+                tokens += t
+        r, t = self.counters.totals_since(user_id, day)
+        return requests + r, tokens + t
+
+    def status(self, user_id: UUID) -> QuotaStatus:
+        q = settings.quota
+        requests, tokens = self.usage_today(user_id)
+        return QuotaStatus(
+            requests_used=requests,
+            tokens_used=tokens,
+            requests_limit=q.daily_requests_hard,
+            tokens_limit=q.daily_tokens_hard,
+            soft_exceeded=requests >= q.daily_requests_soft or tokens >= q.daily_tokens_soft,
+            hard_exceeded=requests >= q.daily_requests_hard or tokens >= q.daily_tokens_hard,
+        )
+
+    async def flush(self) -> None:
+        """Сбрасывает накопленные приращения в БД и обновляет глобальное представление."""
+        async with self._flush_lock:
+            deltas = self.counters.drain()
+            if not deltas:
+                return
+            self._flushing = deltas
+            rows = [
+                {
+                    "user_id": user_id,
+                    "period": period,
+                    "bucket_start": bucket,
+                    "requests": requests,
+                    "tokens": tokens,
+                }
+                for (user_id, period, bucket), (requests, tokens) in rollup(deltas).items()
+            ]
+            committed = False
+            try:
+                async with self.session_factory() as session:
+                    for start in range(0, len(rows), _UPSERT_CHUNK):
+                        await session.execute(_upsert(rows[start:start + _UPSERT_CHUNK]))
+                    await session.commit()
+                    committed = True
+                    await self._refresh(session, {user_id for user_id, _ in deltas})
+            except BaseException as exc:
+                if not committed:
+                    # Приращения не записаны — вернем их, чтобы сбросить позже.
+                    self.counters.merge(deltas)
+                if not isinstance(exc, Exception):
+                    raise
+                logger.exception("Usage flush failed")
+            finally:
+                self._flushing = {}
+
+    async def _refresh(self, session, user_ids: set[UUID]) -> None:
+        day = bucket_start(datetime.now(timezone.utc), "day")
+        result = await session.execute(
+            select(UsageRollup.user_id, UsageRollup.requests, UsageRollup.tokens).where(
+                UsageRollup.period == "day",
+                UsageRollup.bucket_start == day,
+                UsageRollup.user_id.in_(user_ids),
+            )
+        )
+        self._global = {
+            uid: snapshot for uid, snapshot in self._global.items() if snapshot[0] == day
+        }
+        for user_id, requests, tokens in result.all():
+            self._global[user_id] = (day, requests, tokens)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновый сброс и записывает остаток."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+quota_manager = QuotaManager()
@@ -0,0 +1,36 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class ChatRequest(BaseModel):
+    """Запрос к ассистенту: промпт, предыдущие сообщения и параметры генерации."""
+
+    prompt: str = Field(min_length=1, max_length=8000)
+    context: List[str] = Field(default_factory=list)
+    model: Optional[str] = None
+    temperature: float = Field(default=settings.assistant.temperature, ge=0.0, le=2.0)
+    max_tokens: int = Field(default=settings.assistant.max_tokens, ge=1, le=4096)
+    # background — для фоновых задач (суммаризация и т.п.): такие запросы
+    # попадают в пакет только после интерактивных
+    priority: Literal["interactive", "background"] = "interactive"
+
+
+class ChatReply(BaseModel):
+    # Идентификатор обмена; сообщения индексируются как `<id>:prompt` и `<id>:reply`
+    message_id: str
+    text: str
+    cached: bool = False
+
+
+class CacheStats(BaseModel):
+    requests: int
+    hits: int
+    coalesced: int
+    misses: int
+    hit_ratio: float
+    saved_seconds: float
+    entries: int
+    in_flight: int
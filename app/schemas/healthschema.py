@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class CheckResult(BaseModel):
+    ok: bool
+    detail: Optional[str] = None
+
+
+class ReadinessReport(BaseModel):
+    """Последний результат фоновой проверки зависимостей."""
+
+    ready: bool
+    checked_at: Optional[datetime] = None
+    checks: Dict[str, CheckResult] = {}
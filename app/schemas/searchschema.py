@@ -0,0 +1,16 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    """Найденное сообщение, его фрагмент и косинусная близость к запросу."""
+
+    message_id: str
+    score: float
+    snippet: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
@@ -0,0 +1,29 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class IntrospectRequest(BaseModel):
+    tokens: List[str] = Field(
+        min_length=1, max_length=settings.auth_settings.introspect_max_tokens
+    )
+
+
+class TokenIntrospection(BaseModel):
+    """Результат проверки одного токена (по мотивам RFC 7662)."""
+
+    active: bool
+    # access или refresh; active=True только у access-токенов
+    token_type: Optional[str] = None
+    sub: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    exp: Optional[int] = None
+    iat: Optional[int] = None
+    error: Optional[str] = None
+
+
+class IntrospectResponse(BaseModel):
+    results: List[TokenIntrospection]
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import List, Literal
+
+from pydantic import BaseModel, ConfigDict
+
+Period = Literal["minute", "hour", "day"]
+
+
+class QuotaStatus(BaseModel):
+    """Потребление за текущие сутки (UTC) относительно лимитов."""
+
+    requests_used: int
+    tokens_used: int
+    requests_limit: int
+    tokens_limit: int
+    soft_exceeded: bool = False
+    hard_exceeded: bool = False
+
+
+class UsageRollupRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    period: Period
+    bucket_start: datetime
+    requests: int
+    tokens: int
+
+
+class UsageReport(BaseModel):
+    quota: QuotaStatus
+    rollups: List[UsageRollupRead]
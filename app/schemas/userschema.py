@@ -1,7 +1,7 @@
 from pydantic import field_validator
 from annotated_types import MinLen, MaxLen
 from datetime import datetime
-from typing import Optional, Annotated
+from typing import List, Optional, Annotated
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
@@ -79,6 +79,17 @@ class UserRead(BaseModel):
     deleted_at: Optional[datetime] = None
 
 
+class UserPage(BaseModel):
+    """
+    Страница административного списка пользователей.
+    `estimated_total` — оценка планировщика, а не точный COUNT(*).
+    """
+
+    items: List[UserRead]
+    next_cursor: Optional[str] = None
+    estimated_total: Optional[int] = None
+
+
 # --------- Внутренняя схема (для сервисного слоя) ---------
 
 
@@ -0,0 +1,77 @@
+"""
+Функции эмбеддинга текста для семантического поиска.
+
+Эмбеддер — любой объект с атрибутом `dim` и методом `embed(texts)`,
+возвращающим матрицу float32 формы (len(texts), dim) с L2-нормированными
+строками. По умолчанию используется детерминированный `HashingEmbedder`,
+который не требует модели и сети; в продакшене его можно заменить через
+`set_embedder`.
+"""
+
+import hashlib
+import re
+from typing import Protocol, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Нормирует строки матрицы по L2 (нулевые строки остаются нулевыми)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """Локальный детерминированный эмбеддер на основе feature hashing.
+
+    Слова и биграммы хэшируются blake2b в `dim` корзин со знаком. Близкие по
+    лексике тексты получают близкие векторы, результат не зависит от процесса
+    и запуска.
+    """
+
+    def __init__(self, dim: int = settings.search.embedding_dim):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens + bigrams
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                out[row, (value >> 1) % self.dim] += sign
+        return normalize_rows(out)
+
+
+_embedder: Embedder = HashingEmbedder()
+
+
+def get_embedder() -> Embedder:
+    """Возвращает текущий эмбеддер."""
+    return _embedder
+
+
+def set_embedder(embedder: Embedder) -> None:
+    """Подменяет эмбеддер (например, на модель sentence-transformers).
+
+    Размерность должна совпадать с `settings.search.embedding_dim`, иначе
+    существующие индексы станут несовместимы.
+    """
+    global _embedder
+    _embedder = embedder
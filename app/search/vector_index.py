@@ -0,0 +1,318 @@
+"""
+Векторный индекс сообщений пользователя.
+
+Каждый пользователь получает отдельный каталог в `settings.search.index_dir`:
+
+- `vectors.f32` — непрерывный массив float32 формы (N, dim), читается через
+  `np.memmap`, новые строки дописываются в конец файла;
+- `ids.txt` — идентификаторы сообщений в том же порядке, по одному на строку:
+  `id<TAB>фрагмент текста в JSON` (строки без фрагмента — только `id`);
+- `ivf_centroids.npy`, `ivf_assign.i32` — опциональный грубый квантователь
+  (IVF): центроиды кластеров и номер кластера для каждой строки.
+
+Векторы L2-нормированы, поэтому косинусная близость равна скалярному
+произведению. Поиск — векторизованное `matrix @ query` и `argpartition`.
+
+В каталог могут писать несколько воркеров: запись идет под `flock` на файле
+`.lock`, и перед дописыванием индекс перечитывается, если файлы изменил
+другой процесс. Поиск перечитывает индекс, когда меняется размер
+`vectors.f32` или центроиды.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+from app.search.embeddings import normalize_rows
+
+_VECTORS_FILE = "vectors.f32"
+_IDS_FILE = "ids.txt"
+_CENTROIDS_FILE = "ivf_centroids.npy"
+_ASSIGN_FILE = "ivf_assign.i32"
+_LOCK_FILE = ".lock"
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Возвращает индексы k наибольших значений по убыванию."""
+    if k >= scores.shape[0]:
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class VectorIndex:
+    """Индекс одного пользователя с инкрементальным добавлением.
+
+    Методы потокобезопасны; вызывать их из async-кода следует через
+    threadpool, так как они выполняют файловый ввод-вывод и numpy-вычисления.
+    """
+
+    def __init__(self, path: Path, dim: int = settings.search.embedding_dim):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._ids: list[str] = []
+        self._snippets: list[Optional[str]] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._signature: tuple = ()
+        with self._lock, self._file_lock():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def is_ivf(self) -> bool:
+        return self._centroids is not None
+
+    @contextmanager
+    def _file_lock(self):
+        """Межпроцессная блокировка каталога индекса."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / _LOCK_FILE, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _disk_signature(self) -> tuple:
+        def stat(name: str) -> Optional[tuple[int, int]]:
+            try:
+                st = os.stat(self.path / name)
+            except FileNotFoundError:
+                return None
+            return st.st_size, st.st_mtime_ns
+
+        vectors = stat(_VECTORS_FILE)
+        return (vectors[0] if vectors else 0, stat(_CENTROIDS_FILE))
+
+    def _load(self) -> None:
+        """Читает индекс с диска; вызывается под `_lock` и `_file_lock`.
+
+        После аварийного завершения файлы могут разойтись: строк в
+        `vectors.f32` больше, чем id, или последняя строка записана не до
+        конца. Файлы обрезаются на диске до общего числа целых записей,
+        иначе следующее дописывание сдвинуло бы векторы относительно id.
+        """
+        row_bytes = 4 * self.dim
+        ids_path = self.path / _IDS_FILE
+        data = ids_path.read_bytes() if ids_path.exists() else b""
+        # Строка без завершающего перевода строки записана не полностью.
+        lines = data.split(b"\n")[:-1]
+
+        vectors_path = self.path / _VECTORS_FILE
+        size = vectors_path.stat().st_size if vectors_path.exists() else 0
+        count = min(size // row_bytes, len(lines))
+
+        ids_end = sum(len(line) + 1 for line in lines[:count])
+        if len(data) != ids_end:
+            os.truncate(ids_path, ids_end)
+        if size != count * row_bytes:
+            os.truncate(vectors_path, count * row_bytes)
+        self._ids, self._snippets = [], []
+        for line in lines[:count]:
+            message_id, _, snippet = line.decode().partition("\t")
+            self._ids.append(message_id)
+            self._snippets.append(json.loads(snippet) if snippet else None)
+        self._vectors = self._map_vectors(count)
+
+        self._centroids = self._assign = None
+        centroids_path = self.path / _CENTROIDS_FILE
+        assign_path = self.path / _ASSIGN_FILE
+        if centroids_path.exists() and assign_path.exists():
+            self._centroids = np.load(centroids_path)
+            assigned = min(assign_path.stat().st_size // 4, count)
+            if assign_path.stat().st_size != assigned * 4:
+                os.truncate(assign_path, assigned * 4)
+            assign = np.fromfile(assign_path, dtype=np.int32)
+            if assigned < count:
+                # Строки, дописанные до появления центроидов у этого процесса
+                missing = self._nearest_centroid(np.asarray(self._vectors[assigned:]))
+                with open(assign_path, "ab") as f:
+                    f.write(missing.tobytes())
+                assign = np.concatenate([assign, missing])
+            self._assign = assign
+
+        self._signature = self._disk_signature()
+
+    def _refresh(self) -> None:
+        """Перечитывает индекс, если его изменил другой процесс."""
+        if self._disk_signature() == self._signature:
+            return
+        with self._lock, self._file_lock():
+            if self._disk_signature() != self._signature:
+                self._load()
+
+    def _map_vectors(self, count: int) -> Optional[np.ndarray]:
+        if count == 0:
+            return None
+        return np.memmap(
+            self.path / _VECTORS_FILE,
+            dtype=np.float32,
+            mode="r",
+            shape=(count, self.dim),
+        )
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def add(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        snippets: Optional[list[Optional[str]]] = None,
+    ) -> None:
+        """Дописывает векторы в индекс без перестроения.
+
+        `snippets` — фрагменты текста сообщений, которые возвращаются в
+        результатах поиска. В IVF-режиме новые строки относятся к ближайшему существующему
+        центроиду. При достижении `ivf_min_vectors` квантователь обучается
+        автоматически.
+        """
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        snippets = snippets if snippets is not None else [None] * len(ids)
+        if len(ids) != vectors.shape[0] or len(snippets) != len(ids):
+            raise ValueError("ids, vectors and snippets length mismatch")
+        if not ids:
+            return
+
+        with self._lock, self._file_lock():
+            if self._disk_signature() != self._signature:
+                self._load()
+            with open(self.path / _VECTORS_FILE, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.path / _IDS_FILE, "a") as f:
+                f.write("".join(_ids_line(i, s) for i, s in zip(ids, snippets)))
+            if self.is_ivf:
+                assign = self._nearest_centroid(vectors)
+                with open(self.path / _ASSIGN_FILE, "ab") as f:
+                    f.write(assign.tobytes())
+                self._assign = np.concatenate([self._assign, assign])
+
+            self._snippets.extend(snippets)
+            self._ids.extend(ids)
+            self._vectors = self._map_vectors(len(self._ids))
+
+            if not self.is_ivf and len(self._ids) >= settings.search.ivf_min_vectors:
+                self._train_ivf()
+            self._signature = self._disk_signature()
+
+    def train_ivf(self, n_lists: Optional[int] = None, iterations: int = 10) -> None:
+        """Обучает грубый квантователь (сферический k-means) и перераспределяет строки."""
+        with self._lock, self._file_lock():
+            if self._disk_signature() != self._signature:
+                self._load()
+            self._train_ivf(n_lists, iterations)
+            self._signature = self._disk_signature()
+
+    def _train_ivf(self, n_lists: Optional[int] = None, iterations: int = 10) -> None:
+        count = len(self._ids)
+        if count == 0:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(count)))
+        n_lists = min(n_lists, count)
+
+        rng = np.random.default_rng(0)
+        sample_size = min(count, n_lists * 256)
+        sample_idx = np.sort(rng.choice(count, size=sample_size, replace=False))
+        sample = np.asarray(self._vectors[sample_idx])
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+
+        self._centroids = centroids
+        assign = np.empty(count, dtype=np.int32)
+        chunk = 65_536
+        for start in range(0, count, chunk):
+            block = np.asarray(self._vectors[start:start + chunk])
+            assign[start:start + chunk] = self._nearest_centroid(block)
+        self._assign = assign
+
+        np.save(self.path / _CENTROIDS_FILE, centroids)
+        assign.tofile(self.path / _ASSIGN_FILE)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: int = settings.search.ivf_nprobe,
+    ) -> list[tuple[str, float, Optional[str]]]:
+        """Возвращает до k троек (message_id, score, snippet) по убыванию близости."""
+        query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(1, self.dim))[0]
+        self._refresh()
+        with self._lock:
+            vectors, ids, snippets = self._vectors, self._ids, self._snippets
+            centroids, assign = self._centroids, self._assign
+        if vectors is None or k <= 0:
+            return []
+
+        if centroids is not None:
+            probe = top_k(centroids @ query, min(nprobe, centroids.shape[0]))
+            rows = np.flatnonzero(np.isin(assign[: vectors.shape[0]], probe))
+            scores = np.asarray(vectors[rows]) @ query
+        else:
+            rows = None
+            scores = np.asarray(vectors @ query)
+
+        best = top_k(scores, k)
+        positions = [rows[i] for i in best] if rows is not None else list(best)
+        return [
+            (ids[row], float(scores[i]), snippets[row]) for i, row in zip(best, positions)
+        ]
+
+
+def _ids_line(message_id: str, snippet: Optional[str]) -> str:
+    if snippet is None:
+        return f"{message_id}\n"
+    return f"{message_id}\t{json.dumps(snippet, ensure_ascii=False)}\n"
+
+
+class VectorIndexRegistry:
+    """LRU-кэш открытых индексов по id пользователя.
+
+    Открытыми держатся не больше `max_open` индексов; вытесненный индекс
+    закрывается сборщиком мусора и при следующем обращении читается с диска.
+    """
+
+    def __init__(
+        self,
+        root: Path = settings.search.index_dir,
+        max_open: int = settings.search.max_open_indexes,
+    ):
+        self.root = root
+        self.max_open = max_open
+        self._indexes: OrderedDict[UUID, VectorIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> VectorIndex:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                self._indexes.move_to_end(user_id)
+                return index
+            index = VectorIndex(self.root / str(user_id))
+            self._indexes[user_id] = index
+            while len(self._indexes) > self.max_open:
+                self._indexes.popitem(last=False)
+            return index
+
+
+registry = VectorIndexRegistry()
@@ -0,0 +1,129 @@
+import base64
+import json
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import func, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette import status
+
+from app.exceptions.base_ex import BadRequestException
+from app.models.user_models import Users
+from app.schemas.userschema import UserPage, UserRead
+
+DeletedFilter = Literal["exclude", "only", "include"]
+
+
+def encode_cursor(created_at: datetime, user_id: UUID) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(user_id)}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["c"]), UUID(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise BadRequestException(
+            status_code=status.HTTP_400_BAD_REQUEST, message="Invalid cursor"
+        )
+
+
+def _prefix_match(column, prefix: str):
+    """Префиксное совпадение как диапазон [prefix, prefix+1) в collation "C".
+
+    В отличие от LIKE 'abc%' с параметром, диапазон использует функциональный
+    индекс и в generic-плане prepared statement.
+    """
+    expr = func.lower(column).collate("C")
+    condition = expr >= prefix
+    last = ord(prefix[-1])
+    if last < 0x10FFFF:
+        condition = condition & (expr < prefix[:-1] + chr(last + 1))
+    return condition
+
+
+async def _estimate_rows(db: AsyncSession, stmt) -> Optional[int]:
+    """Оценка числа строк по плану запроса (EXPLAIN), без COUNT(*).
+
+    Запрос компилируется с плейсхолдерами, значения фильтров передаются
+    драйверу отдельно и в текст SQL не попадают.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+    compiled = stmt.compile(dialect=db.bind.dialect)
+    values = compiled.construct_params()
+    params = tuple(values[name] for name in compiled.positiontup or ())
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def list_users(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    deleted: DeletedFilter = "exclude",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> UserPage:
+    """
+    Административный список пользователей с keyset-пагинацией.
+
+    Сортировка — от новых к старым по (created_at, id). Страница выбирается
+    условием `(created_at, id) < курсор` по индексу, а не OFFSET, поэтому
+    время ответа не зависит от номера страницы.
+
+    Args:
+        db: Сессия базы данных
+        q: Префикс username или email (без учета регистра)
+        is_active: Фильтр по активности
+        deleted: exclude — без удаленных, only — только удаленные, include — все
+        limit: Размер страницы
+        cursor: Курсор из `next_cursor` предыдущей страницы
+
+    Returns:
+        UserPage: Пользователи, курсор следующей страницы и оценка общего числа
+    """
+    conditions = []
+    if q:
+        prefix = q.lower()
+        conditions.append(
+            _prefix_match(Users.username, prefix) | _prefix_match(Users.email, prefix)
+        )
+    if is_active is not None:
+        conditions.append(Users.is_active == is_active)
+    if deleted == "exclude":
+        conditions.append(Users.deleted_at.is_(None))
+    elif deleted == "only":
+        conditions.append(Users.deleted_at.is_not(None))
+
+    filtered = select(Users).where(*conditions)
+    page = filtered
+    if cursor:
+        created_at, user_id = decode_cursor(cursor)
+        page = page.where(tuple_(Users.created_at, Users.id) < (created_at, user_id))
+    page = page.order_by(Users.created_at.desc(), Users.id.desc()).limit(limit + 1)
+
+    result = await db.execute(page)
+    users = result.scalars().all()
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+    estimated_total = None
+    if not cursor:
+        estimated_total = await _estimate_rows(db, filtered)
+
+    return UserPage(
+        items=[UserRead.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+        estimated_total=estimated_total,
+    )
@@ -1,15 +1,28 @@
-from fastapi import Depends, Form, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, Form, HTTPException, Request, status
+from fastapi.security import (
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+    HTTPAuthorizationCredentials,
+)
+import hashlib
+import hmac
+import jwt
 from jwt.exceptions import InvalidTokenError
 from sqlmodel import select
 from sqlalchemy.exc import IntegrityError
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from starlette.concurrency import run_in_threadpool
 
+from app.audit import writer as audit
+from app.core.config import settings
 from app.db.database import get_db
 from app.jwtauth import utils as auth_utils
+from app.jwtauth.jwks import verification_keys
 from app.models.user_models import Users
 from app.schemas.userschema import UserSchema, UserCreate, UserRead
+from app.schemas.tokenschema import TokenIntrospection
 from app.exceptions import (
     AuthException,
     ForbiddenException,
@@ -18,18 +31,22 @@ from app.jwtauth.utils import hash_password
 
 
 http_bearer = HTTPBearer()
+http_basic = HTTPBasic(auto_error=False)
 # async def authenticate(
 #     credentials: HTTPBearer,
 # ):
 
 
-async def create_user(db: AsyncSession, user: UserCreate) -> Dict[str, Any]:
+async def create_user(
+    db: AsyncSession, user: UserCreate, request: Optional[Request] = None
+) -> Dict[str, Any]:
     """
     Создает нового пользователя в базе данных.
     
     Args:
         db: Сессия базы данных
         user: Данные для создания пользователя
+        request: HTTP-запрос для журнала безопасности (IP, User-Agent)
         
     Returns:
         Dict[str, Any]: Результат операции с данными пользователя или ошибкой
@@ -49,11 +66,18 @@ async def create_user(db: AsyncSession, user: UserCreate) -> Dict[str, Any]:
         await db.commit()
     except IntegrityError:
         await db.rollback()
+        await audit.audit_log.emit(
+            audit.REGISTER_FAILED, request=request, username=user.username,
+            detail="duplicate username or email",
+        )
         return {
             "status": "error",
             "detail": "User with this username or email already exists",
         }
     await db.refresh(user_obj)
+    await audit.audit_log.emit(
+        audit.REGISTER, request=request, user_id=user_obj.id, username=user_obj.username
+    )
     # Не включаем hashed_password в ответ
     return {
         "status": "ok",
@@ -79,6 +103,7 @@ async def _get_user_by_username(db: AsyncSession, username: str) -> Users | None
 
 
 async def validate_auth_user(
+    request: Request,
     username: str = Form(),
     password: str = Form(),
     db: AsyncSession = Depends(get_db),
@@ -88,6 +113,7 @@ async def validate_auth_user(
     - Ищет пользователя по имени в БД
     - Сравнивает пароль с bcrypt-хэшем
     - Проверяет, что пользователь активен
+    - Пишет успешный или неудачный вход в журнал безопасности
 
     Возвращает `UserSchema` без изменения внешнего поведения эндпоинтов.
     """
@@ -97,14 +123,29 @@ async def validate_auth_user(
 
     user: Users | None = await _get_user_by_username(db, username)
     if user is None:
+        await audit.audit_log.emit(
+            audit.LOGIN_FAILED, request=request, username=username, detail="unknown user"
+        )
         raise unauthorized_exc
 
     if not auth_utils.validate_password(password, user.password):
+        await audit.audit_log.emit(
+            audit.LOGIN_FAILED, request=request, user_id=user.id, username=username,
+            detail="bad password",
+        )
         raise unauthorized_exc
 
     if not user.is_active:
+        await audit.audit_log.emit(
+            audit.LOGIN_FAILED, request=request, user_id=user.id, username=username,
+            detail="inactive",
+        )
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
+    await audit.audit_log.emit(
+        audit.LOGIN_SUCCESS, request=request, user_id=user.id, username=username
+    )
+
     return UserSchema(
         id=user.id,
         username=user.username,
@@ -130,16 +171,20 @@ def get_current_token_payload(
         dict: Декодированный payload JWT токена
         
     Raises:
-        AuthException: При некорректном или недействительном токене
+        AuthException: При некорректном или недействительном токене, а также
+            если это не access-токен
     """
+    invalid_exc = AuthException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        message="Invalid token",
+    )
     try:
         token = credentials.credentials
         payload = auth_utils.decode_jwt(token=token)
     except InvalidTokenError:
-        raise AuthException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            message="Invalid token",
-        )
+        raise invalid_exc
+    if payload.get(auth_utils.TOKEN_TYPE_FIELD) != auth_utils.ACCESS_TOKEN_TYPE:
+        raise invalid_exc
     return payload
 
 
@@ -192,3 +237,98 @@ async def get_current_active_user(
         status_code=status.HTTP_403_FORBIDDEN,
         message="You are not authorized to view this resource",
     )
+
+
+async def get_current_admin_user(
+    user: UserSchema = Depends(get_current_active_user),
+) -> UserSchema:
+    """Пропускает только администраторов (`auth_settings.admin_usernames`).
+
+    Иначе возвращает 403.
+    """
+    if user.username in settings.auth_settings.admin_usernames:
+        return user
+    raise ForbiddenException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        message="Admin access required",
+    )
+
+
+def get_introspection_client(
+    credentials: Optional[HTTPBasicCredentials] = Depends(http_basic),
+) -> str:
+    """Проверяет учетные данные сервиса (`auth_settings.introspect_clients`).
+
+    Returns:
+        str: client_id сервиса
+
+    Raises:
+        AuthException: Если учетные данные не переданы или неверны
+    """
+    unauthorized_exc = AuthException(
+        status_code=status.HTTP_401_UNAUTHORIZED, message="Invalid client credentials"
+    )
+    if credentials is None:
+        raise unauthorized_exc
+    expected = settings.auth_settings.introspect_clients.get(credentials.username)
+    digest = hashlib.sha256(credentials.password.encode()).hexdigest()
+    # Сравнение выполняется и для неизвестного client_id — время ответа
+    # не выдает, какие клиенты существуют
+    valid = hmac.compare_digest(digest, expected or "0" * 64)
+    if expected is None or not valid:
+        raise unauthorized_exc
+    return credentials.username
+
+
+def _introspect_one(token: str, keys: Dict[str, Any]) -> TokenIntrospection:
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = keys.get(kid) if kid else next(iter(keys.values()))
+        if key is None:
+            return TokenIntrospection(active=False, error="Unknown key id")
+        payload = auth_utils.decode_jwt(token=token, public_key=key)
+    except InvalidTokenError as exc:
+        return TokenIntrospection(active=False, error=type(exc).__name__)
+    token_type = payload.get(auth_utils.TOKEN_TYPE_FIELD)
+    # Refresh-токен не дает доступа к API, даже если подпись и срок в порядке
+    if token_type != auth_utils.ACCESS_TOKEN_TYPE:
+        return TokenIntrospection(
+            active=False, token_type=token_type, error="Not an access token"
+        )
+    return TokenIntrospection(
+        active=True,
+        token_type=token_type,
+        sub=payload.get("sub"),
+        name=payload.get("name"),
+        email=payload.get("email"),
+        exp=payload.get("exp"),
+        iat=payload.get("iat"),
+    )
+
+
+def _introspect(tokens: List[str]) -> List[TokenIntrospection]:
+    keys = verification_keys()
+    checked: Dict[str, TokenIntrospection] = {}
+    for token in tokens:
+        if token not in checked:
+            checked[token] = _introspect_one(token, keys)
+    return [checked[token] for token in tokens]
+
+
+async def introspect_tokens(tokens: List[str]) -> List[TokenIntrospection]:
+    """
+    Проверяет пачку токенов за один вызов.
+
+    Ключ выбирается по заголовку `kid` (в том числе ключи ротации из JWKS),
+    проверка подписи, `exp`, `iss` и `aud` — через `decode_jwt`. Повторяющиеся
+    токены проверяются один раз. Активными считаются только access-токены:
+    refresh-токен возвращается с `active=False` и `token_type="refresh"`.
+    Проверка подписи нагружает CPU, поэтому выполняется в threadpool.
+
+    Args:
+        tokens: JWT токены
+
+    Returns:
+        List[TokenIntrospection]: Результаты в порядке исходных токенов
+    """
+    return await run_in_threadpool(_introspect, tokens)
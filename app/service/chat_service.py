@@ -0,0 +1,97 @@
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+from app.assistant.backend import GenerationParams, get_backend
+from app.assistant.batching import Priority, current_priority, current_user
+from app.assistant.response_cache import cache_key, response_cache
+from app.core.config import settings
+from app.quota.manager import quota_manager
+from app.schemas.chatschema import ChatRequest, ChatReply, CacheStats
+from app.service.quota_service import estimate_tokens
+from app.service.search_service import schedule_indexing
+
+
+def _params(request: ChatRequest) -> GenerationParams:
+    return GenerationParams(
+        model=request.model or settings.assistant.model,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+    )
+
+
+def _open(request: ChatRequest, user_id: UUID) -> tuple[AsyncIterator[str], bool]:
+    # Задача генерации наследует контекст, по нему планировщик пакетов
+    # распределяет очередь между пользователями и приоритетами.
+    current_user.set(user_id)
+    current_priority.set(Priority[request.priority.upper()])
+    params = _params(request)
+    prompt = request.prompt
+    if request.context:
+        prompt = "\n".join([*request.context, prompt])
+    key = cache_key(request.prompt, params, request.context)
+    return response_cache.open(key, lambda: get_backend().stream(prompt, params))
+
+
+def _index_exchange(user_id: UUID, message_id: str, prompt: str, reply: str) -> None:
+    schedule_indexing(
+        user_id, [f"{message_id}:prompt", f"{message_id}:reply"], [prompt, reply]
+    )
+
+
+async def generate_reply(request: ChatRequest, user_id: UUID) -> ChatReply:
+    """
+    Генерирует ответ ассистента через кэш ответов.
+
+    Одинаковые запросы (с точностью до нормализации промпта) с теми же
+    параметрами и контекстом обслуживаются из кэша или присоединяются к уже
+    идущей генерации. Промпт и ответ добавляются в поисковый индекс
+    пользователя в фоне.
+
+    Args:
+        request: Промпт, контекст и параметры генерации
+        user_id: ID пользователя, от имени которого идет запрос
+
+    Returns:
+        ChatReply: Идентификатор обмена, текст ответа и признак того, что
+        модель не вызывалась
+    """
+    message_id = str(uuid4())
+    chunks, cached = _open(request, user_id)
+    text = "".join([chunk async for chunk in chunks])
+    quota_manager.record(user_id, tokens=estimate_tokens(request.prompt, *request.context, text))
+    _index_exchange(user_id, message_id, request.prompt, text)
+    return ChatReply(message_id=message_id, text=text, cached=cached)
+
+
+async def _counted(
+    chunks: AsyncIterator[str], request: ChatRequest, user_id: UUID, message_id: str
+) -> AsyncIterator[str]:
+    tokens = estimate_tokens(request.prompt, *request.context)
+    parts = []
+    try:
+        async for chunk in chunks:
+            tokens += estimate_tokens(chunk)
+            parts.append(chunk)
+            yield chunk
+        # Оборванный ответ в историю не попадает
+        _index_exchange(user_id, message_id, request.prompt, "".join(parts))
+    finally:
+        quota_manager.record(user_id, tokens=tokens)
+
+
+def stream_reply(request: ChatRequest, user_id: UUID) -> tuple[str, AsyncIterator[str]]:
+    """
+    Возвращает идентификатор обмена и ответ ассистента потоком частей.
+
+    Закэшированные ответы воспроизводятся теми же частями, что отдала модель.
+    Токены учитываются в квоте по мере отдачи частей клиенту; полностью
+    отданный ответ добавляется в поисковый индекс.
+    """
+    message_id = str(uuid4())
+    chunks, _ = _open(request, user_id)
+    return message_id, _counted(chunks, request, user_id, message_id)
+
+
+def get_cache_stats() -> CacheStats:
+    """Метрики кэша: доля попаданий и сэкономленное время генерации."""
+    return CacheStats(**response_cache.stats())
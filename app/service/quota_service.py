@@ -0,0 +1,69 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import Depends, Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.exceptions import TooManyRequestsException
+from app.models.usage_models import UsageRollup
+from app.quota.manager import quota_manager
+from app.schemas.usageschema import Period, UsageRollupRead
+from app.schemas.userschema import UserSchema
+from app.service.auth_service import get_current_active_user
+
+QUOTA_WARNING_HEADER = "X-Quota-Warning"
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Грубая оценка числа токенов: по одному на слово."""
+    return sum(len(text.split()) for text in texts)
+
+
+async def enforce_quota(
+    response: Response,
+    user: UserSchema = Depends(get_current_active_user),
+) -> UserSchema:
+    """Проверяет дневную квоту текущего пользователя и учитывает запрос.
+
+    При превышении жесткого лимита — 429. При превышении мягкого лимита
+    запрос выполняется, но в ответ добавляется заголовок `X-Quota-Warning`.
+    Эндпоинты, которые сами возвращают Response, должны перенести заголовок
+    из `response` (FastAPI не добавляет его к возвращенному объекту).
+    """
+    quota = quota_manager.status(user.id)
+    if quota.hard_exceeded:
+        raise TooManyRequestsException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            message="Daily quota exceeded",
+        )
+    if quota.soft_exceeded:
+        response.headers[QUOTA_WARNING_HEADER] = "soft limit reached"
+    quota_manager.record(user.id, requests=1)
+    return user
+
+
+async def get_usage_rollups(
+    db: AsyncSession, user_id: UUID, period: Period, limit: int
+) -> List[UsageRollupRead]:
+    """
+    Возвращает последние интервалы потребления пользователя.
+
+    Данные в БД отстают от фактических не больше чем на интервал сброса.
+
+    Args:
+        db: Сессия базы данных
+        user_id: ID пользователя
+        period: Гранулярность: minute, hour или day
+        limit: Число последних интервалов
+
+    Returns:
+        List[UsageRollupRead]: Интервалы по убыванию времени
+    """
+    result = await db.execute(
+        select(UsageRollup)
+        .where(UsageRollup.user_id == user_id, UsageRollup.period == period)
+        .order_by(UsageRollup.bucket_start.desc())
+        .limit(limit)
+    )
+    return [UsageRollupRead.model_validate(row) for row in result.scalars().all()]
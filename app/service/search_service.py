@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import List
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.search.embeddings import get_embedder
+from app.search.vector_index import registry
+from app.schemas.searchschema import SearchHit
+
+logger = logging.getLogger(__name__)
+
+# Ссылки на фоновые задачи индексации, чтобы их не собрал сборщик мусора
+_pending: set[asyncio.Task] = set()
+
+
+def _index_messages(user_id: UUID, message_ids: List[str], texts: List[str]) -> None:
+    vectors = get_embedder().embed(texts)
+    snippets = [text[: settings.search.snippet_chars] for text in texts]
+    registry.get(user_id).add(message_ids, vectors, snippets)
+
+
+def _search(user_id: UUID, query: str, limit: int) -> List[SearchHit]:
+    vector = get_embedder().embed([query])[0]
+    hits = registry.get(user_id).search(vector, k=limit)
+    return [
+        SearchHit(message_id=mid, score=score, snippet=snippet)
+        for mid, score, snippet in hits
+    ]
+
+
+async def index_messages(user_id: UUID, message_ids: List[str], texts: List[str]) -> None:
+    """
+    Добавляет сообщения пользователя в его векторный индекс.
+
+    Вызывается в фоне после ответа ассистента. Индекс пополняется
+    инкрементально, перестроение не требуется.
+
+    Args:
+        user_id: ID владельца сообщений
+        message_ids: Идентификаторы сообщений
+        texts: Тексты сообщений в том же порядке; первые `snippet_chars`
+            символов сохраняются для выдачи в результатах поиска
+    """
+    await run_in_threadpool(_index_messages, user_id, message_ids, texts)
+
+
+async def _index_logged(user_id: UUID, message_ids: List[str], texts: List[str]) -> None:
+    try:
+        await index_messages(user_id, message_ids, texts)
+    except Exception:
+        logger.exception("Failed to index %d messages", len(message_ids))
+
+
+def schedule_indexing(user_id: UUID, message_ids: List[str], texts: List[str]) -> None:
+    """Индексирует сообщения в фоне, не задерживая ответ пользователю."""
+    task = asyncio.create_task(_index_logged(user_id, message_ids, texts))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def search_messages(user_id: UUID, query: str, limit: int) -> List[SearchHit]:
+    """
+    Семантический поиск по истории сообщений пользователя.
+
+    Args:
+        user_id: ID пользователя
+        query: Текст запроса
+        limit: Максимальное число результатов
+
+    Returns:
+        List[SearchHit]: Найденные сообщения по убыванию близости
+    """
+    return await run_in_threadpool(_search, user_id, query, limit)
@@ -0,0 +1,130 @@
+"""
+Фоновая проверка зависимостей для readiness-пробы.
+
+Раз в `probe_interval_seconds` задача проверяет соединение с БД
+(`SELECT 1` с таймаутом), заполненность пула соединений, доступность
+ключей JWT и задержку event loop, и кэширует результат. Эндпоинт readiness
+только читает кэш, поэтому частые пробы балансировщика с многих подов не
+создают нагрузки на Postgres. Если результат устарел (проба зависла),
+воркер считается неготовым.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import async_engine
+from app.schemas.healthschema import CheckResult, ReadinessReport
+
+
+async def _select_one() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_database() -> CheckResult:
+    # Таймаут покрывает и ожидание соединения из пула
+    try:
+        await asyncio.wait_for(_select_one(), settings.health.db_timeout_seconds)
+    except asyncio.TimeoutError:
+        return CheckResult(ok=False, detail="timeout")
+    except Exception as exc:
+        return CheckResult(ok=False, detail=type(exc).__name__)
+    return CheckResult(ok=True)
+
+
+def _check_pool() -> CheckResult:
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return CheckResult(ok=True, detail="no pool")
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    in_use = pool.checkedout()
+    saturation = in_use / capacity if capacity else 0.0
+    return CheckResult(
+        ok=saturation < settings.health.pool_saturation_threshold,
+        detail=f"{in_use}/{capacity}",
+    )
+
+
+def _check_keys() -> CheckResult:
+    auth = settings.auth_settings
+    missing = [
+        path.name
+        for path in (auth.private_key, auth.public_key)
+        if not (path.is_file() and os.access(path, os.R_OK))
+    ]
+    if missing:
+        return CheckResult(ok=False, detail="unreadable: " + ", ".join(missing))
+    return CheckResult(ok=True)
+
+
+def _check_loop_lag(lag: float) -> CheckResult:
+    lag_ms = lag * 1000
+    return CheckResult(
+        ok=lag_ms < settings.health.loop_lag_threshold_ms, detail=f"{lag_ms:.1f}ms"
+    )
+
+
+class DependencyProbe:
+    def __init__(self, interval: float = settings.health.probe_interval_seconds):
+        self.interval = interval
+        self._report = ReadinessReport(ready=False)
+        self._checked_at = 0.0
+        self._lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> ReadinessReport:
+        """Выполняет проверки и сохраняет результат."""
+        # Пул проверяется до того, как проба сама займет соединение
+        pool = _check_pool()
+        checks = {
+            "database": await _check_database(),
+            "pool": pool,
+            "keys": _check_keys(),
+            "event_loop": _check_loop_lag(self._lag),
+        }
+        self._report = ReadinessReport(
+            ready=all(check.ok for check in checks.values()),
+            checked_at=datetime.now(timezone.utc),
+            checks=checks,
+        )
+        self._checked_at = time.monotonic()
+        return self._report
+
+    def report(self) -> ReadinessReport:
+        """Кэшированный результат без обращения к зависимостям."""
+        if time.monotonic() - self._checked_at > settings.health.stale_after_seconds:
+            return self._report.model_copy(update={"ready": False})
+        return self._report
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            # Насколько позже запланированного проснулся цикл
+            self._lag = max(0.0, time.monotonic() - started - self.interval)
+            await self.probe()
+
+    async def start(self) -> None:
+        """Выполняет первую проверку и запускает периодическую."""
+        if self._task is None:
+            await self.probe()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает периодическую проверку."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+dependency_probe = DependencyProbe()
@@ -0,0 +1,4 @@
+import os
+
+# Настройки читают DB_URL при импорте; для модульных тестов БД не нужна.
+os.environ.setdefault("DB_URL", "postgresql+asyncpg://localhost/test")
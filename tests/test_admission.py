@@ -0,0 +1,58 @@
+import asyncio
+
+from app.core.config import AdmissionGroup
+from app.middleware.admission import AdaptiveLimiter, AdmissionController
+
+
+def _limiter(**overrides) -> AdaptiveLimiter:
+    config = dict(initial_limit=1, min_limit=1, max_queue=2, queue_timeout_ms=10)
+    return AdaptiveLimiter("test", AdmissionGroup(**{**config, **overrides}))
+
+
+def test_timed_out_waiters_free_the_queue():
+    async def scenario():
+        limiter = _limiter()
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.stats()["queued"] == 0
+
+        asyncio.get_running_loop().call_later(0.005, limiter.release, None)
+        assert await limiter.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limiter = _limiter(max_queue=1, queue_timeout_ms=1000)
+        assert await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        asyncio.get_running_loop().call_later(0.005, limiter.release, None)
+        assert await limiter.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_server_errors_shrink_the_limit():
+    limiter = _limiter(initial_limit=10, max_limit=20)
+    limiter.in_flight = 2
+    limiter.release(0.001)
+    grown = limiter.limit
+    assert grown > 10
+
+    limiter.release(0.001, failed=True)
+    assert limiter.limit < grown
+
+
+def test_liveness_is_exempt():
+    controller = AdmissionController(
+        {"health": AdmissionGroup(prefixes=["/api/v1/health"])},
+        exempt_paths=["/api/v1/health/live"],
+    )
+    assert controller.limiter_for("/api/v1/health/live") is None
+    assert controller.limiter_for("/api/v1/health/ready") is controller.limiters["health"]
@@ -0,0 +1,97 @@
+import asyncio
+
+from app.assistant.backend import GenerationParams
+from app.assistant.batching import MicroBatchScheduler, Priority
+
+
+class RecordingBackend:
+    """Пакетный бэкенд, запоминающий состав пакетов."""
+
+    def __init__(self, steps: int = 2):
+        self.steps = steps
+        self.batches: list[list[str]] = []
+
+    async def stream_batch(self, items):
+        self.batches.append([prompt for prompt, _ in items])
+        for step in range(self.steps):
+            await asyncio.sleep(0)
+            for index, (prompt, _) in enumerate(items):
+                yield index, f"{prompt}:{step}"
+
+
+def _params(model: str = "local") -> GenerationParams:
+    return GenerationParams(model=model)
+
+
+async def _collect(scheduler, prompt, user, priority=Priority.INTERACTIVE, model="local"):
+    return [c async for c in scheduler.submit(prompt, _params(model), user, priority)]
+
+
+async def _run_queued(backend, requests, max_batch_size):
+    """Ставит запросы в очередь до запуска планировщика и дожидается ответов."""
+    scheduler = MicroBatchScheduler(backend, max_batch_size=max_batch_size, max_wait=0.01)
+    tasks = [asyncio.create_task(_collect(scheduler, *request)) for request in requests]
+    await asyncio.sleep(0)
+    scheduler.start()
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        await scheduler.stop()
+
+
+def test_chunks_reach_their_request():
+    backend = RecordingBackend()
+    requests = [(f"p{i}", f"user{i % 2}") for i in range(5)]
+    results = asyncio.run(_run_queued(backend, requests, max_batch_size=8))
+    assert results == [[f"p{i}:0", f"p{i}:1"] for i in range(5)]
+    assert backend.batches == [["p0", "p1", "p2", "p3", "p4"]]
+
+
+def test_round_robin_across_users():
+    backend = RecordingBackend()
+    requests = [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b"), ("c1", "c")]
+    asyncio.run(_run_queued(backend, requests, max_batch_size=3))
+    assert backend.batches == [["a1", "b1", "c1"], ["a2", "a3"]]
+
+
+def test_background_after_interactive():
+    backend = RecordingBackend()
+    requests = [
+        ("bg", "a", Priority.BACKGROUND),
+        ("i1", "b", Priority.INTERACTIVE),
+        ("i2", "c", Priority.INTERACTIVE),
+    ]
+    asyncio.run(_run_queued(backend, requests, max_batch_size=2))
+    assert backend.batches == [["i1", "i2"], ["bg"]]
+
+
+def test_batches_do_not_mix_models():
+    backend = RecordingBackend()
+    requests = [
+        ("x1", "a", Priority.INTERACTIVE, "model-x"),
+        ("y1", "b", Priority.INTERACTIVE, "model-y"),
+        ("x2", "c", Priority.INTERACTIVE, "model-x"),
+    ]
+    asyncio.run(_run_queued(backend, requests, max_batch_size=4))
+    assert backend.batches == [["x1", "x2"], ["y1"]]
+
+
+def test_cancelled_request_is_withdrawn():
+    async def scenario():
+        backend = RecordingBackend()
+        scheduler = MicroBatchScheduler(backend, max_batch_size=4, max_wait=0.05)
+        task = asyncio.create_task(_collect(scheduler, "gone", "a"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["pending"] == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler.stats()["pending"] == 0
+
+        scheduler.start()
+        try:
+            assert await _collect(scheduler, "kept", "a") == ["kept:0", "kept:1"]
+        finally:
+            await scheduler.stop()
+        assert backend.batches == [["kept"]]
+
+    asyncio.run(scenario())